@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+# Compare the full-window transfer path of the round 1.28inch panel with the
+# circle-clipped band modes: bytes sent per frame and average frame time.
+import sys
+import time
+import logging
+sys.path.append("..")
+from lib import LCD_1inch28
+from PIL import Image
+
+FRAMES = 20
+BAND_COUNTS = [0, 4, 8, 16, 30, 240]   # 0 = today's full 240x240 window
+
+logging.basicConfig(level=logging.INFO)
+
+disp = LCD_1inch28.LCD_1inch28()
+disp.Init()
+disp.clear()
+disp.bl_DutyCycle(50)
+
+# Pixel bytes sent, and windows opened (a window may take several
+# pipelined band transfers, so transfers are not counted)
+sent = [0, 0]
+write = disp.spi_writebuffer
+def counting_write(data):
+    sent[0] += len(data)
+    write(data)
+disp.spi_writebuffer = counting_write
+set_windows = disp.SetWindows
+def counting_set_windows(*args):
+    sent[1] += 1
+    set_windows(*args)
+disp.SetWindows = counting_set_windows
+
+images = [Image.open('../pic/LCD_1inch28_%d.jpg' % i) for i in (1, 2, 3)]
+
+try:
+    baseline = None
+    for bands in BAND_COUNTS:
+        disp.circle_bands = bands
+        sent[0] = sent[1] = 0
+        start = time.perf_counter()
+        for i in range(FRAMES):
+            disp.ShowImage(images[i % len(images)])
+        elapsed = (time.perf_counter() - start) / FRAMES
+        per_frame = sent[0] // FRAMES
+        if baseline is None:
+            baseline = (per_frame, elapsed)
+        logging.info("%-12s %6d bytes/frame (%5.1f%%)  %3d windows  %6.2f ms/frame (%5.1f%%)",
+                     "full" if bands == 0 else "%d bands" % bands,
+                     per_frame, 100.0 * per_frame / baseline[0], sent[1] // FRAMES,
+                     elapsed * 1000, 100.0 * elapsed / baseline[1])
+    disp.module_exit()
+except KeyboardInterrupt:
+    disp.module_exit()
+    exit()
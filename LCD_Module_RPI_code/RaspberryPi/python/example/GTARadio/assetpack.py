@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""Precompiled asset pack: display-ready RGB565 frames in one mmap'able file
+
+Layout: MAGIC and the offset/length of the JSON index, padding up to the
+first page, the raw 240x240 big-endian RGB565 frames, then the index. The
+index maps keys to frame offsets:
+
+    game/<game>/<station>   station logo ('' station = game logo)
+    asset/<file>            settings and shutdown images (playlist, hell_*, Aus, Shutdown)
+
+Frames are stored at full brightness, brightness is set with the backlight.
+
+Build it on the device after changing the library:
+
+    python assetpack.py [--output PATH]
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import numpy as np
+from lib import frame
+
+from library import (SHARED_BASE_PATH, DISPLAY_SIZE, BRIGHTNESS_FACTORS,
+                     get_available_games, get_station_files, get_display_names,
+                     get_image_path_with_priority, get_station_ticker_text, load_display_image)
+
+ASSET_PACK_PATH = os.path.join(SHARED_BASE_PATH, 'assets.gtapack')
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), 'assets')
+ASSET_IMAGES = (['playlist.png', 'Aus.png', 'Shutdown.png']
+                   + [f'hell_{i}.png' for i in range(len(BRIGHTNESS_FACTORS))])
+
+MAGIC = b'GTAPACK2'
+HEADER_FORMAT = '<II'  # index offset, index length
+DATA_OFFSET = 4096     # frames start on the first page boundary
+
+def frame_key(*parts):
+    return '/'.join(str(part) for part in parts)
+
+class AssetPack:
+    """Read-only view of a pack file, frames are returned as views into the mmap"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not an asset pack: {path}")
+        index_offset, index_len = struct.unpack_from(HEADER_FORMAT, self._mm, len(MAGIC))
+        index = json.loads(self._mm[index_offset:index_offset + index_len].decode('utf-8'))
+        self.width, self.height = index['width'], index['height']
+        self.frames = index['frames']
+
+    def frame(self, *key):
+        """RGB565 frame (height x width) for a key, None if it is not packed"""
+        offset = self.frames.get(frame_key(*key))
+        if offset is None:
+            return None
+        return np.frombuffer(self._mm, dtype='>u2', count=self.width * self.height,
+                             offset=DATA_OFFSET + offset).reshape(self.height, self.width)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def open_pack(path):
+    """Open the asset pack if it exists, None otherwise"""
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = AssetPack(path)
+        print(f"Loaded asset pack: {path} ({len(pack.frames)} frames)")
+        return pack
+    except Exception as e:
+        print(f"Error loading asset pack {path}: {e}")
+        return None
+
+def collect_frames():
+    """Yield (key, image) for every frame that goes into the pack"""
+    for game_index in range(len(get_available_games(force_refresh=True))):
+        for display_index in range(len(get_station_files(game_index, force_refresh=True)) + 1):
+            names = get_display_names(game_index, display_index)
+            image_path = get_image_path_with_priority(game_index, display_index)
+            if not names or not image_path or not os.path.exists(image_path):
+                continue
+            if get_station_ticker_text(game_index, display_index):
+                continue  # animated by display.py, not a static frame
+            try:
+                image = load_display_image(image_path)
+            except Exception as e:
+                print(f"Skipping {image_path}: {e}")
+                continue
+            yield frame_key('game', *names), image
+
+    for name in ASSET_IMAGES:
+        image_path = os.path.join(ASSETS_PATH, name)
+        if os.path.exists(image_path):
+            yield frame_key('asset', name), load_display_image(image_path)
+
+def build_pack(output_path):
+    """Render every station, game and settings screen into a pack file"""
+    width, height = DISPLAY_SIZE
+    frames = {}
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        # Frames are streamed to disk as they are rendered, the header is
+        # filled in once the index is known
+        f.write(b'\0' * DATA_OFFSET)
+        for key, image in collect_frames():
+            frames[key] = f.tell() - DATA_OFFSET
+            f.write(frame.to_rgb565(image).tobytes())
+        index_offset = f.tell()
+        index = {'width': width, 'height': height, 'frames': frames}
+        index_bytes = json.dumps(index).encode('utf-8')
+        f.write(index_bytes)
+        f.seek(0)
+        f.write(MAGIC + struct.pack(HEADER_FORMAT, index_offset, len(index_bytes)))
+    os.replace(tmp_path, output_path)
+    print(f"Wrote {len(frames)} frames to {output_path}")
+    return len(frames)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile the station library into an RGB565 asset pack')
+    parser.add_argument('--output', default=ASSET_PACK_PATH, help='pack file to write')
+    args = parser.parse_args()
+    build_pack(args.output)
@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""Stage-by-stage timing of showing a station, written as JSON
+
+Builds a synthetic library (games with stations whose covers have the sizes
+found in real rips), then times every stage between a station index and
+the bytes on the bus:
+
+    probe         get_image_path with warm directory listings
+    probe_cold    get_image_path after clear_library_cache
+    decode        Image.open and load
+    resize        LANCZOS resize to DISPLAY_SIZE and RGB conversion
+    backlight     brightness level change (a PWM write, frames are not re-rendered)
+    encode        pixel packing as done by ShowImage (RGB565, or RGB444 at 12 bits)
+    spi           an encoded frame through ShowFrame onto the bus
+    show          ShowImage end to end (encode and bus, pipelined)
+
+The bus is the simulated one in counting mode, so spi and show measure the
+host side of a transfer; bus_ms_per_frame estimates the wire time at the
+SPI clock. A second pass runs under tracemalloc and reports per stage the
+peak bytes allocated and the blocks still held afterwards (numpy buffers
+are traced, Pillow's internal image memory is not).
+
+    python benchmark.py [--iterations N] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import numpy as np
+import PIL
+from PIL import Image
+from lib import frame, LCD_1inch28
+from lib.simulator import SimulatedBackend
+
+import library
+
+# (width, height, format) of the covers in the synthetic library
+COVER_SIZES = [
+    (240, 240, 'png'),      # already display size, no resize
+    (300, 300, 'jpg'),
+    (500, 500, 'png'),
+    (640, 640, 'jpg'),
+    (1000, 1000, 'jpg'),
+    (1400, 1400, 'jpg'),
+    (3000, 3000, 'jpg'),
+]
+STAGES = ['probe', 'probe_cold', 'decode', 'resize', 'backlight', 'encode', 'spi', 'show']
+PERCENTILES = [50, 90, 99]
+
+def cover_label(size):
+    return '{0}x{1}.{2}'.format(*size)
+
+def synthetic_cover(width, height, seed):
+    """Smooth gradients with some noise, compresses like cover art rather than like a flat fill"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    img = np.empty((height, width, 3), dtype=np.float32)
+    img[..., 0] = 127 + 127 * np.sin(x / width * rng.uniform(2, 8))
+    img[..., 1] = 127 + 127 * np.cos(y / height * rng.uniform(2, 8))
+    img[..., 2] = 255 * (x + y) / (width + height)
+    img += rng.normal(0, 12, (height, width, 1))
+    return Image.fromarray(np.clip(img, 0, 255).astype(np.uint8))
+
+def build_library(path, games, stations):
+    """Write games/stations (empty MP3s) with covers cycling through COVER_SIZES
+
+    Returns a list of (game_index, display_index, cover size).
+    """
+    entries = []
+    for g in range(games):
+        game_path = os.path.join(path, 'Game {0:02d}'.format(g))
+        os.makedirs(game_path)
+        for s in range(stations):
+            name = 'Station {0:02d}'.format(s)
+            open(os.path.join(game_path, name + '.mp3'), 'wb').close()
+            size = COVER_SIZES[(g * stations + s) % len(COVER_SIZES)]
+            width, height, fmt = size
+            cover = synthetic_cover(width, height, g * stations + s)
+            if fmt == 'jpg':
+                cover.save(os.path.join(game_path, name + '.jpg'), quality=90)
+            else:
+                cover.save(os.path.join(game_path, name + '.png'))
+            entries.append((g, s + 1, size))
+    return entries
+
+def summarize(samples):
+    """Latency statistics in milliseconds of a list of nanosecond samples"""
+    ms = np.array(samples, dtype=np.float64) / 1e6
+    stats = {'count': len(samples), 'mean_ms': round(float(ms.mean()), 4),
+             'min_ms': round(float(ms.min()), 4), 'max_ms': round(float(ms.max()), 4)}
+    for p in PERCENTILES:
+        stats['p{0}_ms'.format(p)] = round(float(np.percentile(ms, p)), 4)
+    return stats
+
+class StageRunner:
+    """Runs the stages for one station, recording a time (and allocations when traced) per stage"""
+
+    def __init__(self, disp, trace=False):
+        self.disp = disp
+        self.trace = trace
+        self.times = {stage: [] for stage in STAGES}
+        self.peak_bytes = {stage: 0 for stage in STAGES}
+        self.blocks = {stage: 0 for stage in STAGES}
+
+    def run(self, stage, func, *args):
+        if self.trace:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        result = func(*args)
+        elapsed = time.perf_counter_ns() - start
+        if self.trace:
+            peak = tracemalloc.get_traced_memory()[1] - base
+            after = tracemalloc.take_snapshot()
+            held = sum(stat.count_diff for stat in after.compare_to(before, 'lineno'))
+            self.peak_bytes[stage] = max(self.peak_bytes[stage], peak)
+            self.blocks[stage] = max(self.blocks[stage], held)
+        else:
+            self.times[stage].append(elapsed)
+        return result
+
+    def station(self, game_index, display_index, level):
+        disp = self.disp
+        self.run('probe', library.get_image_path, game_index, display_index)
+        library.clear_library_cache()
+        path = self.run('probe_cold', library.get_image_path, game_index, display_index)
+        image = self.run('decode', decode, path)
+        image = self.run('resize', resize, image)
+        self.run('backlight', disp.bl_DutyCycle, library.backlight_duty_cycle(level))
+        self.run('encode', frame.encode, image, disp.color_bits)
+        pix = frame.to_rgb565(image)
+        self.run('spi', disp.ShowFrame, pix)
+        self.run('show', disp.ShowImage, image)
+
+def decode(path):
+    image = Image.open(path)
+    image.load()
+    return image
+
+def resize(image):
+    if image.size != library.DISPLAY_SIZE:
+        image = image.resize(library.DISPLAY_SIZE, Image.Resampling.LANCZOS)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+def run_benchmark(args):
+    path = tempfile.mkdtemp(prefix='gtaradio-bench-')
+    saved_base = library.SHARED_BASE_PATH
+    try:
+        entries = build_library(path, args.games, args.stations)
+        library.SHARED_BASE_PATH = path + os.sep
+        library.clear_library_cache()
+
+        disp = LCD_1inch28.LCD_1inch28(backend=SimulatedBackend(interpret=False))
+        disp.color_bits = args.color_bits
+        disp.circle_bands = args.circle_bands
+        disp.Init()
+        bus = disp.backend.panel
+
+        # Warm up imports, caches and the pipeline thread
+        warm = StageRunner(disp)
+        warm.station(*entries[0][:2], 0)
+
+        runner = StageRunner(disp)
+        by_cover = {}
+        for i in range(args.iterations):
+            for n, (game_index, display_index, size) in enumerate(entries):
+                before = len(runner.times['decode'])
+                runner.station(game_index, display_index, (i + n) % len(library.BRIGHTNESS_FACTORS))
+                cover = by_cover.setdefault(cover_label(size), {'decode': [], 'resize': []})
+                for stage in cover:
+                    cover[stage].append(runner.times[stage][before])
+
+        bus.reset_counters()
+        disp.ShowImage(resize(decode(library.get_image_path(*entries[0][:2]))))
+        frame_bytes = bus.bytes_written
+        frame_transactions = bus.transactions
+
+        traced = StageRunner(disp, trace=True)
+        tracemalloc.start()
+        try:
+            for game_index, display_index, size in entries:
+                traced.station(game_index, display_index, 0)
+        finally:
+            tracemalloc.stop()
+    finally:
+        library.SHARED_BASE_PATH = saved_base
+        library.clear_library_cache()
+        shutil.rmtree(path, ignore_errors=True)
+
+    stages = {}
+    for stage in STAGES:
+        stats = summarize(runner.times[stage])
+        stats['peak_bytes'] = traced.peak_bytes[stage]
+        stats['held_blocks'] = traced.blocks[stage]
+        stages[stage] = stats
+    return {
+        'config': {'games': args.games, 'stations': args.stations, 'iterations': args.iterations,
+                   'color_bits': args.color_bits, 'circle_bands': args.circle_bands,
+                   'display_size': list(library.DISPLAY_SIZE), 'spi_hz': disp.SPEED,
+                   'covers': [cover_label(size) for size in COVER_SIZES]},
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(),
+                        'numpy': np.__version__, 'pillow': PIL.__version__},
+        'bus': {'bytes_per_frame': frame_bytes, 'transactions_per_frame': frame_transactions,
+                'bus_ms_per_frame': round(frame_bytes * 8 * 1000.0 / disp.SPEED, 3)},
+        'stages': stages,
+        'by_cover': {label: {stage: summarize(samples) for stage, samples in cover.items()}
+                     for label, cover in sorted(by_cover.items())},
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time each stage of showing a station on a synthetic library')
+    parser.add_argument('--games', type=int, default=2, help='games in the synthetic library')
+    parser.add_argument('--stations', type=int, default=len(COVER_SIZES), help='stations per game')
+    parser.add_argument('--iterations', type=int, default=5, help='passes over the library')
+    parser.add_argument('--color-bits', type=int, choices=(16, 12), default=16, help='pixel format on the bus')
+    parser.add_argument('--circle-bands', type=int, default=16, help='circle bands, 0 for full frames')
+    parser.add_argument('--output', help='JSON file to write, stdout if not given')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"Wrote {args.output}")
+    else:
+        print(text)
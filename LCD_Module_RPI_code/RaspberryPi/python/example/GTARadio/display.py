@@ -4,18 +4,25 @@ import os
 import sys
 import time
 import logging
-import tempfile
-from mutagen import File
-from mutagen.id3 import ID3, APIC
+import threading
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from lib import LCD_1inch28
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
-import RPi.GPIO as GPIO
+from lib import frame
+from lib.fbdev import FramebufferDisplay
+from lib.marquee import Marquee
+from lib.transition import Transition
+from lib.compositor import Compositor
+from lib.ring import ProgressRing
+from lib import text
+import numpy as np
+from PIL import Image, ImageChops, ImageColor
 
-GPIO.setmode(GPIO.BCM)
-
-SHARED_BASE_PATH = '/mnt/shared/gta/'
+from library import (BRIGHTNESS_FACTORS, DISPLAY_SIZE, TICKER_LINE_HEIGHT, backlight_duty_cycle,
+                     get_available_games, get_display_names, get_image_path_with_priority,
+                     get_station_ticker_text, create_ticker_strip, wrap_words, clear_library_cache, color565)
+from assetpack import ASSET_PACK_PATH, open_pack
+import warmstart
 
 # Raspberry Pi pin configuration:
 RST = 27
@@ -25,274 +32,334 @@ bus = 0
 device = 0
 logging.basicConfig(level=logging.DEBUG)
 
-disp = LCD_1inch28.LCD_1inch28()
-disp.Init()
-disp.clear()
+# Clockwise turn of the picture (0, 90, 180, 270), e.g. 180 for a panel
+# mounted upside down. Set in the panel's MADCTL, images are never rotated.
+DISPLAY_ROTATION = 0
+
+# LCD_FRAMEBUFFER=/dev/fbN hands frames to a kernel framebuffer driver
+# (fbtft, panel-mipi-dbi) instead of driving the panel over spidev; a plain
+# file path gives a file-backed framebuffer for running headless.
+# LCD_BACKLIGHT is the name of its backlight under /sys/class/backlight
+# (e.g. rpi_backlight), or the full path of a backlight directory.
+FRAMEBUFFER = os.environ.get('LCD_FRAMEBUFFER')
+
+if FRAMEBUFFER:
+    disp = FramebufferDisplay(FRAMEBUFFER, *DISPLAY_SIZE, backlight=os.environ.get('LCD_BACKLIGHT'))
+else:
+    disp = LCD_1inch28.LCD_1inch28()
+disp.circle_bands = 16  # skip the invisible corners of the round panel
+disp.color_bits = 16    # 12 sends a quarter fewer bytes per frame at 4 bits per channel
+if DISPLAY_ROTATION:
+    disp.SetRotation(DISPLAY_ROTATION)
+# A panel left running by the last process keeps its picture: no reset and
+# init tables (which flash the glass white), the saved frame is redrawn below
+_start_time = time.monotonic()
+_warm_start = warmstart.can_resume(disp)
+if _warm_start:
+    disp.Resume()
+else:
+    disp.Init()
+    disp.clear()
+    warmstart.mark_initialised(disp)
+
+# Scrolling ticker for long station names: a band of two text lines in the
+# middle of the screen, moved one row per step by the panel's scroll registers
+TICKER_ROWS = 2 * TICKER_LINE_HEIGHT
+TICKER_TOP = (DISPLAY_SIZE[1] - TICKER_ROWS) // 2
+TICKER_STEP_INTERVAL = 0.04  # seconds per row
+
+# Animated station changes: 'slide', 'wheel', 'crossfade' or None to snap
+TRANSITION_EFFECT = 'slide'
+TRANSITION_DURATION = 0.25  # seconds
+TRANSITION_FPS = 30
+
+# Idle power management: without input for IDLE_DIM_AFTER seconds the
+# backlight is dimmed, after IDLE_SLEEP_AFTER the panel goes into sleep mode
+# with the backlight off and nothing is drawn. note_activity() wakes it.
+# None turns a step off.
+IDLE_DIM_AFTER = 60      # seconds
+IDLE_SLEEP_AFTER = 300   # seconds
+IDLE_DIM_DUTY = 5        # backlight percent while dimmed
+
+# Playback progress as an arc along the edge of the round panel, an overlay
+# over station frames. None turns it off.
+PROGRESS_RING_COLOR = 'white'
+PROGRESS_RING_THICKNESS = 4
 
 # Cache variables
-_games_cache = None
-_station_files_cache = {}
-_image_cache = {}  # Cache for loaded images
-_last_cache_update = 0
-CACHE_TIMEOUT = 30  # seconds
+_image_cache = {}  # Encoded RGB565 frames of station images, at full brightness
+
+# Precompiled RGB565 frames (see assetpack.py), None when no pack was built
+_asset_pack = open_pack(ASSET_PACK_PATH)
+
+# Display worker: the only thread that talks to disp. Requests go into a
+# one-slot mailbox, so a request that has not been drawn yet is replaced by
+# the next one instead of queuing up behind it.
+_display_request = None
+_display_request_cond = threading.Condition()
+
+# Widgets over the station frame on the glass (its base, None on any other
+# screen). Layers are changed from any thread under _display_request_cond,
+# the worker sends the dirty tiles.
+_compositor = Compositor(disp)
+_overlay_pending = False
+
+if PROGRESS_RING_COLOR:
+    _progress_ring = ProgressRing(*DISPLAY_SIZE, thickness=PROGRESS_RING_THICKNESS,
+                                  color=color565(PROGRESS_RING_COLOR))
+    _compositor.place_pixels('progress', _progress_ring.pix, _progress_ring.alpha, 0, 0)
+else:
+    _progress_ring = None
+
+# Idle state: 'on', 'dim' or 'asleep', changed by note_activity and the idle
+# thread under _idle_cond. The panel itself is put to sleep and woken by the
+# display worker, which redraws the last request on wake. Sleep is not a
+# mailbox request, so it never replaces a pending one: _sleep_pending is
+# only set while the mailbox is empty, and a request arriving first cancels it.
+_idle_state = 'on'
+_sleep_pending = False
+_last_activity = time.monotonic()
+_idle_cond = threading.Condition()
+_last_render = None
+
+def post_display_request(render, *args):
+    """Hand a render call to the display worker, dropping any pending one"""
+    global _display_request
+    with _display_request_cond:
+        if _display_request is not None:
+            logging.debug("Dropped superseded display request: %s%s", _display_request[0].__name__, _display_request[1])
+        _display_request = (render, args)
+        _display_request_cond.notify()
+
+def _display_worker():
+    global _display_request, _overlay_pending, _last_render, _sleep_pending
+    while True:
+        with _display_request_cond:
+            # Overlay changes wait while the panel sleeps, the compositor keeps them dirty
+            while (_display_request is None and not _sleep_pending
+                   and not (_overlay_pending and not disp.asleep)):
+                _display_request_cond.wait()
+            request, _display_request = _display_request, None
+            sleep, _sleep_pending = _sleep_pending and request is None, False
+            if not disp.asleep:
+                _overlay_pending = False
+        try:
+            if sleep:
+                _sleep_panel()
+                continue
+            if request is not None:
+                render, args = request
+                if render is not _render_wake:
+                    # Something to draw: awake, and the idle timers start over
+                    if disp.asleep:
+                        _wake_panel()
+                    else:
+                        _reset_idle()
+                    _last_render = request
+                render(*args)
+            with _display_request_cond:
+                if _compositor.base is not None and not disp.asleep:
+                    _compositor.flush()
+        except Exception as e:
+            print(f"Error in display worker: {e}")
+
+def _request_sleep():
+    """Ask the display worker to put the panel to sleep, False if a request is waiting to be drawn"""
+    global _sleep_pending
+    with _display_request_cond:
+        if _display_request is not None:
+            return False
+        _sleep_pending = True
+        _display_request_cond.notify()
+        return True
+
+def _sleep_panel():
+    """Backlight off and panel into sleep mode, until a request wakes it"""
+    if disp.asleep:
+        return
+    disp.bl_DutyCycle(0)
+    disp.Sleep()
+    warmstart.flush()
+    print("Display asleep")
+
+def _reset_idle():
+    global _idle_state, _last_activity
+    with _idle_cond:
+        _idle_state = 'on'
+        _last_activity = time.monotonic()
+        _idle_cond.notify()
+
+def _wake_panel():
+    _reset_idle()
+    disp.Wake()
+    set_backlight_level(get_current_brightness_index())
+    print("Display awake")
+
+def _render_wake():
+    """Wake the panel and redraw what it showed: the cached station frame, or the last request again"""
+    if not disp.asleep:
+        return
+    _wake_panel()
+    with _display_request_cond:
+        pix = _compositor.frame
+    if pix is not None:
+        disp.ShowFrame(pix)
+    elif _last_render is not None:
+        render, args = _last_render
+        render(*args)
 
-# Brightness levels (0-4) mapped to brightness factors
-BRIGHTNESS_FACTORS = [0.3, 0.5, 0.7, 0.85, 1.0]  # hell_0 to hell_4
+def note_activity():
+    """Report user input (encoder, button, key); returns True if it only woke a sleeping display"""
+    global _idle_state, _last_activity
+    with _idle_cond:
+        state, _idle_state = _idle_state, 'on'
+        _last_activity = time.monotonic()
+        _idle_cond.notify()
+    if state == 'asleep':
+        post_display_request(_render_wake)
+    elif state == 'dim':
+        set_backlight_level(get_current_brightness_index())
+    return state == 'asleep'
 
-def get_current_brightness_factor():
-    """Get the current brightness factor from settings"""
+def _idle_worker():
+    global _idle_state
+    order = ['on', 'dim', 'asleep']
+    with _idle_cond:
+        while True:
+            idle = time.monotonic() - _last_activity
+            steps = ((IDLE_DIM_AFTER, 'dim'), (IDLE_SLEEP_AFTER, 'asleep'))
+            pending = [(after, state) for after, state in steps
+                       if after is not None and order.index(state) > order.index(_idle_state)]
+            if not pending:
+                _idle_cond.wait()
+                continue
+            after, state = min(pending)
+            if idle < after:
+                _idle_cond.wait(after - idle)
+                continue
+            if state == 'dim':
+                disp.bl_DutyCycle(IDLE_DIM_DUTY)
+            elif not _request_sleep():
+                # A request is about to be drawn, which starts the timers over
+                _idle_cond.wait(1.0)
+                continue
+            _idle_state = state
+
+def _wait_for_display_request(timeout):
+    """Sleep on the display worker for up to timeout, True as soon as a new request (or sleep) is pending"""
+    deadline = time.monotonic() + timeout
+    with _display_request_cond:
+        # Overlay changes notify too, keep sleeping through those
+        while _display_request is None and not _sleep_pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _display_request_cond.wait(remaining)
+        return _display_request is not None or _sleep_pending
+
+_display_thread = threading.Thread(target=_display_worker, name='display', daemon=True)
+_display_thread.start()
+_idle_thread = threading.Thread(target=_idle_worker, name='display-idle', daemon=True)
+_idle_thread.start()
+
+def get_current_brightness_index():
+    """Get the current brightness level (0-4) from settings"""
     try:
         from settings import settings_manager
-        brightness_index = settings_manager.current_brightness_index
-        return BRIGHTNESS_FACTORS[brightness_index]
+        return settings_manager.current_brightness_index
     except:
-        return 1.0  # Default full brightness
+        return len(BRIGHTNESS_FACTORS) - 1  # Default full brightness
 
-def apply_brightness(image, brightness_factor):
-    """Apply brightness adjustment to an image"""
-    try:
-        if brightness_factor < 1.0:
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Apply brightness using ImageEnhance
-            enhancer = ImageEnhance.Brightness(image)
-            image = enhancer.enhance(brightness_factor)
-            
-            # Also reduce contrast for more natural dimming
-            if brightness_factor < 0.7:
-                contrast_enhancer = ImageEnhance.Contrast(image)
-                image = contrast_enhancer.enhance(0.9)
-        
-        return image
-    except Exception as e:
-        print(f"Error applying brightness: {e}")
-        return image
+def set_backlight_level(brightness_index):
+    """Set the brightness level (0-4): one PWM write, frames are never re-rendered"""
+    disp.bl_DutyCycle(backlight_duty_cycle(brightness_index))
 
-def get_available_games(force_refresh=False):
-    """Get list of available games with caching"""
-    global _games_cache, _last_cache_update
-    
-    current_time = time.time()
-    
-    if not force_refresh and _games_cache is not None and current_time - _last_cache_update < CACHE_TIMEOUT:
-        return _games_cache
-    
-    if not os.path.exists(SHARED_BASE_PATH):
-        _games_cache = []
-        return _games_cache
-    
-    games = sorted([f for f in os.listdir(SHARED_BASE_PATH) 
-                   if os.path.isdir(os.path.join(SHARED_BASE_PATH, f))])
-    
-    _games_cache = games
-    _last_cache_update = current_time
-    return games
+def show_packed_frame(*key):
+    """Show a frame straight from the asset pack, returns False if it is not packed"""
+    if _asset_pack is None:
+        return False
+    pix = _asset_pack.frame(*key)
+    if pix is None:
+        return False
+    disp.ShowFrame(pix)
+    return True
 
-def get_station_files(game_index, force_refresh=False):
-    """Get MP3 files for a game with caching"""
-    global _station_files_cache
-    
-    games = get_available_games(force_refresh)
-    if game_index >= len(games):
-        return []
-    
-    game_name = games[game_index]
-    
-    # Return cached data if available
-    if not force_refresh and game_name in _station_files_cache:
-        return _station_files_cache[game_name]
-    
-    game_path = os.path.join(SHARED_BASE_PATH, game_name)
-    
-    try:
-        mp3_files = sorted([f for f in os.listdir(game_path) if f.lower().endswith('.mp3')])
-    except PermissionError:
-        print(f"Permission denied accessing: {game_path}")
-        mp3_files = []
-    
-    _station_files_cache[game_name] = mp3_files
-    return mp3_files
+def show_station_frame(pix, previous=None):
+    """Show a station frame, animated from the previous station frame when there is one
 
-def extract_mp3_cover(mp3_path, station_name, game_path):
-    """Extract embedded cover art from MP3 file and save as image"""
-    try:
-        audio = File(mp3_path, easy=True)
-        if audio is None:
-            return None
-        
-        cover_data = None
-        mime_type = 'image/jpeg'  # default
-        
-        # Method 1: ID3v2 APIC frames
-        try:
-            id3 = ID3(mp3_path)
-            pictures = [tag for tag in id3.values() if isinstance(tag, APIC)]
-            if pictures:
-                cover_data = pictures[0].data
-                mime_type = pictures[0].mime
-                print(f"Found ID3v2 cover art in {mp3_path}")
-        except Exception as e:
-            pass
-        
-        # Method 2: Check common tags in easyid3
-        if not cover_data and hasattr(audio, 'tags'):
-            cover_tags = [
-                'APIC:', 'cover', 'coverart', 'albumart', 
-                'metadata_block_picture', 'PICTURE', 'PIC'
-            ]
-            for tag_name in cover_tags:
-                if tag_name in audio.tags:
-                    if hasattr(audio.tags[tag_name], 'data'):
-                        cover_data = audio.tags[tag_name].data
-                    else:
-                        cover_data = audio.tags[tag_name][0]
-                    print(f"Found cover art in tag {tag_name} in {mp3_path}")
-                    break
-        
-        # Method 3: Check for embedded images in any tag
-        if not cover_data and hasattr(audio, 'tags'):
-            for tag in audio.tags.values():
-                if hasattr(tag, 'data') and len(tag.data) > 100:  # Reasonable image size
-                    # Check if it looks like image data
-                    if tag.data.startswith((b'\xff\xd8\xff', b'\x89PNG', b'GIF', b'BM')):
-                        cover_data = tag.data
-                        print(f"Found image data in tag in {mp3_path}")
-                        break
-        
-        if cover_data:
-            # Determine file extension from MIME type or data
-            extension = '.jpg'
-            if 'png' in mime_type.lower() or cover_data.startswith(b'\x89PNG'):
-                extension = '.png'
-            elif 'gif' in mime_type.lower() or cover_data.startswith(b'GIF'):
-                extension = '.gif'
-            elif 'bmp' in mime_type.lower() or cover_data.startswith(b'BM'):
-                extension = '.bmp'
-            
-            # Save extracted cover
-            cover_path = os.path.join(game_path, f"{station_name}_mp3cover{extension}")
-            
-            with open(cover_path, 'wb') as f:
-                f.write(cover_data)
-            
-            print(f"Extracted cover art: {cover_path}")
-            return cover_path
-        
-        print(f"No cover art found in {mp3_path}")
-        return None
-        
-    except Exception as e:
-        print(f"Error extracting cover art from {mp3_path}: {e}")
-        return None
-
-def get_mp3_cover_path(game_index, display_index):
-    """Get cover art path from MP3 file"""
-    games = get_available_games()
-    if game_index >= len(games):
-        return None
-    
-    game_name = games[game_index]
-    game_path = os.path.join(SHARED_BASE_PATH, game_name)
-    
-    station_files = get_station_files(game_index)
-    station_index = display_index - 1
-    
-    if station_index < len(station_files):
-        mp3_file = station_files[station_index]
-        station_name = os.path.splitext(mp3_file)[0]
-        mp3_path = os.path.join(game_path, mp3_file)
-        
-        if os.path.exists(mp3_path):
-            # First check if we already extracted this cover
-            existing_covers = [
-                f for f in os.listdir(game_path) 
-                if f.startswith(f"{station_name}_mp3cover") or f.startswith(f"{station_name}_cover")
-            ]
-            if existing_covers:
-                return os.path.join(game_path, existing_covers[0])
-            
-            # Extract fresh cover art
-            return extract_mp3_cover(mp3_path, station_name, game_path)
-    
-    return None
+    The frame becomes the compositor base, overlays are drawn on it by the worker.
+    """
+    if TRANSITION_EFFECT and previous is not None and previous.shape == pix.shape and previous is not pix:
+        transition = Transition(previous, pix, TRANSITION_EFFECT, TRANSITION_DURATION, TRANSITION_FPS)
+        if not transition.play(disp, wait=_wait_for_display_request):
+            # Superseded by a newer request, which animates on from here
+            pix = transition.last
+        elif transition.dropped:
+            print(f"Transition dropped {transition.dropped} of {transition.steps} frames")
+    else:
+        disp.ShowFrame(pix)
+    with _display_request_cond:
+        _compositor.set_base(pix)
+    warmstart.save_frame(pix)
 
-def get_image_path(game_index, display_index, force_refresh=False):
-    """Get the path to the appropriate image based on game and station with caching"""
-    games = get_available_games(force_refresh)
-    if game_index >= len(games):
-        return None
-    
-    game_name = games[game_index]
-    game_path = os.path.join(SHARED_BASE_PATH, game_name)
-    
-    # If display_index is 0, show game logo
-    if display_index == 0:
-        # Look for common game logo names
-        game_logo_names = ['game.png', 'game.jpg', 'logo.png', 'logo.jpg', 
-                          f'{game_name}.png', f'{game_name}.jpg',
-                          'cover.png', 'cover.jpg', 'default.png']
-        for logo_name in game_logo_names:
-            logo_path = os.path.join(game_path, logo_name)
-            if os.path.exists(logo_path):
-                return logo_path
-        # If no game logo found, create a default one
-        return create_default_game_image(game_name, game_path)
-    
-    # For stations (display_index >= 1), get the station image
-    station_files = get_station_files(game_index, force_refresh)
-    station_index = display_index - 1  # Convert to 0-based station index
-    
-    if station_index >= len(station_files):
-        return None
-    
-    mp3_file = station_files[station_index]
-    station_name = os.path.splitext(mp3_file)[0]
-    
-    # Look for image with same name as MP3
-    image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp']
-    for ext in image_extensions:
-        image_path = os.path.join(game_path, station_name + ext)
-        if os.path.exists(image_path):
-            return image_path
-    
-    # Also check for images without spaces/special characters
-    simple_name = station_name.replace(' ', '').replace('-', '').lower()
-    for ext in image_extensions:
-        try:
-            for file in os.listdir(game_path):
-                if (file.lower().startswith(simple_name) and 
-                    file.lower().endswith(ext) and
-                    not file.lower().endswith('.mp3')):
-                    image_path = os.path.join(game_path, file)
-                    return image_path
-        except PermissionError:
-            continue
-    
-    # If no station image found, create a default one
-    return create_default_station_image(station_name, game_path)
+def _take_station_frame():
+    """Frame on the glass if it is a station frame (with overlays), and leave station mode"""
+    with _display_request_cond:
+        previous = _compositor.frame
+        _compositor.clear_base()
+    return previous
+
+def show_overlay(name, image, x, y):
+    """Draw a widget (PIL image, transparency is kept) over station frames, replacing one of the same name"""
+    global _overlay_pending
+    with _display_request_cond:
+        _compositor.place(name, image, x, y)
+        _overlay_pending = True
+        _display_request_cond.notify()
+
+def hide_overlay(name):
+    """Remove a widget drawn with show_overlay"""
+    global _overlay_pending
+    with _display_request_cond:
+        _compositor.remove(name)
+        _overlay_pending = True
+        _display_request_cond.notify()
+
+def show_progress(position, duration):
+    """Move the progress ring to a playback position (seconds) in a file of duration seconds
 
-def get_image_path_with_priority(game_index, display_index, force_refresh=False):
+    Only the arc segments that changed are sent, by the display worker, and
+    only while a station frame is shown.
     """
-    Get image path with priority:
-    1. Dedicated image file (PNG, JPG, etc.)
-    2. Embedded MP3 cover art
-    3. Default generated image
+    global _overlay_pending
+    if _progress_ring is None:
+        return
+    progress = (position % duration) / duration if duration > 0 else 0.0
+    with _display_request_cond:
+        rects = _progress_ring.set(progress)
+        if rects:
+            _compositor.invalidate(rects)
+            _overlay_pending = True
+            _display_request_cond.notify()
+
+def show_on_background(image, background, box=None):
+    """Show an image drawn on a solid background as a cached fill plus the drawn region
+
+    image is a PIL image or an RGB565 frame; box is the drawn region if the
+    caller knows it (e.g. from text.GlyphAtlas.draw), else it is searched for.
     """
-    # Priority 1: Dedicated image file
-    image_path = get_image_path(game_index, display_index, force_refresh)
-    if image_path and os.path.exists(image_path):
-        return image_path
-    
-    # Priority 2: MP3 cover art (only for stations, not game logos)
-    if display_index > 0:
-        mp3_cover_path = get_mp3_cover_path(game_index, display_index)
-        if mp3_cover_path:
-            return mp3_cover_path
-    
-    # Priority 3: Default generated image (already handled in get_image_path)
-    return image_path
+    if frame.is_rgb565(image):
+        if box is None:
+            rows, cols = np.nonzero(image != color565(background))
+            box = (cols.min(), rows.min(), cols.max() + 1, rows.max() + 1) if rows.size else None
+        disp.clear_color(color565(background))
+        if box:
+            disp.ShowRegion(image[box[1]:box[3], box[0]:box[2]], box[0], box[1])
+        return
+    box = ImageChops.difference(image, Image.new('RGB', image.size, background)).getbbox()
+    disp.clear_color(frame.rgb565(*ImageColor.getrgb(background)))
+    if box:
+        disp.ShowRegion(image.crop(box), box[0], box[1])
 
 def display_settings_image(setting_index):
     """Display settings images"""
@@ -305,104 +372,80 @@ def display_settings_image(setting_index):
     
     if setting_index < len(settings_base_images):
         # For brightness setting, we need to get the current level from settings_manager
+        brightness_index = get_current_brightness_index()
         if setting_index == 1:  # brightness setting
-            from settings import settings_manager
-            current_brightness_image = f"hell_{settings_manager.current_brightness_index}.png"
-            image_path = os.path.join(os.path.dirname(__file__), 'assets', current_brightness_image)
+            image_name = f"hell_{brightness_index}.png"
         else:
-            image_path = os.path.join(os.path.dirname(__file__), 'assets', settings_base_images[setting_index])
+            image_name = settings_base_images[setting_index]
+        image_path = os.path.join(os.path.dirname(__file__), 'assets', image_name)
         
-        if os.path.exists(image_path):
+        if show_packed_frame('asset', image_name):
+            print(f"Displayed packed settings image: {image_name}")
+        elif os.path.exists(image_path):
             try:
                 image = Image.open(image_path)
                 if image.size != (240, 240):
                     image = image.resize((240, 240), Image.Resampling.LANCZOS)
                 
-                # Apply current brightness to settings images too
-                brightness_factor = get_current_brightness_factor()
-                image = apply_brightness(image, brightness_factor)
-                
-                im_r = image.rotate(0)
-                disp.ShowImage(im_r)
-                print(f"Displayed settings image: {os.path.basename(image_path)} (brightness: {brightness_factor})")
+                disp.ShowImage(image)
+                print(f"Displayed settings image: {os.path.basename(image_path)}")
             except Exception as e:
                 print(f"Error displaying settings image: {e}")
-                show_default_image()
+                _render_default_image()
         else:
             print(f"Settings image not found: {image_path}")
-            show_default_image()
+            _render_default_image()
     else:
-        show_default_image()
+        _render_default_image()
 
 def display_shutdown_image():
     """Display the Shutdown.png image"""
     shutdown_image_path = os.path.join(os.path.dirname(__file__), 'assets', 'Shutdown.png')
-    if os.path.exists(shutdown_image_path):
+    # The shutdown screen is always shown at full brightness
+    disp.bl_DutyCycle(100)
+    if show_packed_frame('asset', 'Shutdown.png'):
+        print("Displayed packed Shutdown.png")
+    elif os.path.exists(shutdown_image_path):
         try:
             image = Image.open(shutdown_image_path)
             if image.size != (240, 240):
                 image = image.resize((240, 240), Image.Resampling.LANCZOS)
             
-            # Don't apply brightness to shutdown image - keep it full brightness
-            im_r = image.rotate(0)
-            disp.ShowImage(im_r)
+            disp.ShowImage(image)
             print("Displayed Shutdown.png")
         except Exception as e:
             print(f"Error displaying shutdown image: {e}")
-            show_default_image()
+            _render_default_image()
     else:
-        show_default_image()
+        _render_default_image()
 
 def display_playlist_name(playlist_name):
     """Display playlist name when no logo exists"""
     try:
-        image = Image.new('RGB', (240, 240), color='darkblue')
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-            font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 18)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
+        pix = text.text_frame(*DISPLAY_SIZE, color565('darkblue'))
+        font_large = text.atlas(size=24)
+        font_small = text.atlas(size=18)
         
         # Display "SELECT PLAYLIST" at top
-        draw.text((120, 50), "SELECT PLAYLIST", fill='yellow', font=font_small, anchor="mm")
+        boxes = [font_small.draw(pix, "SELECT PLAYLIST", 120, 50, color565('yellow'), anchor="mm")]
         
         # Split playlist name if too long
-        words = playlist_name.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            if len(test_line) < 15:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
+        lines = wrap_words(playlist_name, 15)
         
         # Draw playlist name lines
         y_pos = 120 - (len(lines) * 15)
         for line in lines:
-            draw.text((120, y_pos), line, fill='white', font=font_large, anchor="mm")
+            boxes.append(font_large.draw(pix, line, 120, y_pos, color565('white'), anchor="mm"))
             y_pos += 30
         
-        # Apply brightness to generated image
-        brightness_factor = get_current_brightness_factor()
-        image = apply_brightness(image, brightness_factor)
-        
-        im_r = image.rotate(0)
-        disp.ShowImage(im_r)
+        show_on_background(pix, 'darkblue', text.union(boxes))
     except Exception as e:
         print(f"Error displaying playlist name: {e}")
-        show_default_image()
+        _render_default_image()
 
-def display_image(game_index, display_index, force_refresh=False):
-    """Display image with support for settings mode and MP3 cover art fallback"""
+def _render_image(game_index, display_index, force_refresh=False):
+    """Render image with support for settings mode and MP3 cover art fallback"""
+    previous = _take_station_frame()
     if game_index == -1:
         # Settings mode
         display_settings_image(display_index)
@@ -412,6 +455,26 @@ def display_image(game_index, display_index, force_refresh=False):
         display_shutdown_image()
         return
     
+    # Long names of stations without their own image scroll as a ticker
+    if disp.scroll_lines:
+        ticker_text = get_station_ticker_text(game_index, display_index)
+        if ticker_text:
+            _render_ticker(ticker_text)
+            return
+    
+    # Precompiled frame from the asset pack, if one was built for this station
+    names = get_display_names(game_index, display_index)
+    packed = _asset_pack.frame('game', *names) if names and _asset_pack is not None else None
+    if packed is not None:
+        show_station_frame(packed, previous)
+        return
+    
+    # Frames are cached at full brightness, so they stay valid across brightness changes
+    cache_key = f"{game_index}_{display_index}"
+    if not force_refresh and cache_key in _image_cache:
+        show_station_frame(_image_cache[cache_key], previous)
+        return
+    
     # Normal game/station display with MP3 cover art fallback
     image_path = get_image_path_with_priority(game_index, display_index, force_refresh)
     
@@ -422,18 +485,12 @@ def display_image(game_index, display_index, force_refresh=False):
             if image.size != (240, 240):
                 image = image.resize((240, 240), Image.Resampling.LANCZOS)
             
-            # Apply current brightness setting
-            brightness_factor = get_current_brightness_factor()
-            image = apply_brightness(image, brightness_factor)
-            
-            im_r = image.rotate(0)
+            # Cache the encoded frame
+            pix = frame.to_rgb565(image)
+            _image_cache[cache_key] = pix
             
-            # Cache the image
-            cache_key = f"{game_index}_{display_index}"
-            _image_cache[cache_key] = im_r
-            
-            disp.ShowImage(im_r)
-            print(f"Displayed image with brightness: {brightness_factor}")
+            show_station_frame(pix, previous)
+            print(f"Displayed image: {os.path.basename(image_path)}")
         except Exception as e:
             print(f"Error displaying image {image_path}: {e}")
             # If it's a game logo that failed, show playlist name instead
@@ -442,7 +499,7 @@ def display_image(game_index, display_index, force_refresh=False):
                 if game_index < len(games):
                     display_playlist_name(games[game_index])
             else:
-                show_default_image()
+                _render_default_image()
     else:
         # If no image found and it's a game logo, show playlist name
         if display_index == 0:
@@ -450,101 +507,56 @@ def display_image(game_index, display_index, force_refresh=False):
             if game_index < len(games):
                 display_playlist_name(games[game_index])
             else:
-                show_default_image()
+                _render_default_image()
         else:
-            show_default_image()
+            _render_default_image()
 
-def show_default_image():
-    """Display a default image when no specific image is found"""
+def _render_ticker(station_name):
+    """Scroll a station name through the ticker band until the next display request"""
+    strip = create_ticker_strip(station_name, TICKER_ROWS)
+    # The blank rows at the end of the strip give the background color
+    disp.clear_color(int(strip[-1, 0]))
+    marquee = Marquee(disp, strip, TICKER_TOP, TICKER_ROWS)
+    marquee.start()
+    print(f"Scrolling ticker: {station_name}")
     try:
-        image = Image.new('RGB', (240, 240), color='black')
-        draw = ImageDraw.Draw(image)
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 18)
-        except:
-            font = ImageFont.load_default()
-        draw.text((120, 120), "NO IMAGE", fill='white', font=font, anchor="mm")
-        
-        # Apply brightness to default image too
-        brightness_factor = get_current_brightness_factor()
-        image = apply_brightness(image, brightness_factor)
+        while not _wait_for_display_request(TICKER_STEP_INTERVAL):
+            marquee.step()
+    finally:
+        marquee.stop()
+
+def _render_default_image():
+    """Render a default image when no specific image is found"""
+    _take_station_frame()
+    try:
+        pix = text.text_frame(*DISPLAY_SIZE, color565('black'))
+        box = text.atlas(size=18).draw(pix, "NO IMAGE", 120, 120, color565('white'), anchor="mm")
         
-        im_r = image.rotate(0)
-        disp.ShowImage(im_r)
+        show_on_background(pix, 'black', box)
     except Exception as e:
         print(f"Error showing default image: {e}")
 
+def display_image(game_index, display_index, force_refresh=False):
+    """Show a game/station (or settings/shutdown screen) on the display worker"""
+    post_display_request(_render_image, game_index, display_index, force_refresh)
+
+def show_default_image():
+    """Show the default image on the display worker"""
+    post_display_request(_render_default_image)
+
 def clear_display_cache():
     """Clear the display cache"""
-    global _games_cache, _station_files_cache, _image_cache, _last_cache_update
-    _games_cache = None
-    _station_files_cache = {}
+    global _image_cache
+    clear_library_cache()
     _image_cache = {}
-    _last_cache_update = 0
     print("Display cache cleared")
 
 def display_image_delay(game_index, station_index):
     time.sleep(0.1)  # Reduced delay
     display_image(game_index, station_index)
 
-# Default image creation functions
-def create_default_game_image(game_name, game_path):
-    """Create a default game logo image"""
-    try:
-        image = Image.new('RGB', (240, 240), color='navy')
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-        except:
-            font = ImageFont.load_default()
-        
-        draw.text((120, 100), game_name, fill='white', font=font, anchor="mm")
-        draw.text((120, 130), "RADIO", fill='yellow', font=font, anchor="mm")
-        
-        default_path = os.path.join(game_path, "default_game.png")
-        image.save(default_path)
-        return default_path
-    except Exception as e:
-        print(f"Error creating default game image: {e}")
-        return None
-
-def create_default_station_image(station_name, game_path):
-    """Create a default station image"""
-    try:
-        image = Image.new('RGB', (240, 240), color='darkgreen')
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-        except:
-            font = ImageFont.load_default()
-        
-        # Split long station names
-        words = station_name.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            if len(test_line) < 20:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
-        
-        # Draw text lines
-        y_pos = 100 - (len(lines) * 12)
-        for line in lines:
-            draw.text((120, y_pos), line, fill='white', font=font, anchor="mm")
-            y_pos += 24
-        
-        default_path = os.path.join(game_path, f"{station_name}.png")
-        image.save(default_path)
-        return default_path
-    except Exception as e:
-        print(f"Error creating default station image: {e}")
-        return None
\ No newline at end of file
+if _warm_start:
+    _saved_frame = warmstart.load_frame(*DISPLAY_SIZE)
+    if _saved_frame is not None:
+        post_display_request(show_station_frame, _saved_frame)
+print(f"Display {'resumed' if _warm_start else 'initialised'} in {(time.monotonic() - _start_time) * 1000:.0f} ms")
@@ -0,0 +1,393 @@
+import os
+import sys
+import time
+import functools
+from mutagen import File
+from mutagen.id3 import ID3, APIC
+from PIL import Image, ImageColor, PngImagePlugin
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from lib import frame, text
+
+SHARED_BASE_PATH = '/mnt/shared/gta/'
+DISPLAY_SIZE = (240, 240)
+
+# Cache variables
+_games_cache = None
+_station_files_cache = {}
+_ticker_text_cache = {}  # (game name, station name) -> ticker text or None
+_last_cache_update = 0
+CACHE_TIMEOUT = 30  # seconds
+
+# Generated station images carry this PNG text key, so they can be told
+# apart from real logos
+GENERATED_IMAGE_KEY = 'GTARadio-generated'
+
+# Station names this long wrap in the default image and get a scrolling ticker
+TICKER_MIN_LENGTH = 20
+TICKER_LINE_HEIGHT = 28
+
+# Brightness levels (0-4) mapped to perceived brightness. They are applied
+# with the backlight, frames are always rendered at full brightness.
+BRIGHTNESS_FACTORS = [0.3, 0.5, 0.7, 0.85, 1.0]  # hell_0 to hell_4
+BACKLIGHT_GAMMA = 2.2
+
+def backlight_duty_cycle(brightness_index):
+    """Backlight PWM duty cycle (percent) for a brightness level
+
+    LED output is linear in the duty cycle but perceived brightness is not,
+    so the level is gamma-corrected.
+    """
+    brightness_index = max(0, min(len(BRIGHTNESS_FACTORS) - 1, brightness_index))
+    return 100.0 * BRIGHTNESS_FACTORS[brightness_index] ** BACKLIGHT_GAMMA
+
+def get_available_games(force_refresh=False):
+    """Get list of available games with caching"""
+    global _games_cache, _last_cache_update
+    
+    current_time = time.time()
+    
+    if not force_refresh and _games_cache is not None and current_time - _last_cache_update < CACHE_TIMEOUT:
+        return _games_cache
+    
+    if not os.path.exists(SHARED_BASE_PATH):
+        _games_cache = []
+        return _games_cache
+    
+    games = sorted([f for f in os.listdir(SHARED_BASE_PATH) 
+                   if os.path.isdir(os.path.join(SHARED_BASE_PATH, f))])
+    
+    _games_cache = games
+    _last_cache_update = current_time
+    return games
+
+def get_station_files(game_index, force_refresh=False):
+    """Get MP3 files for a game with caching"""
+    global _station_files_cache
+    
+    games = get_available_games(force_refresh)
+    if game_index >= len(games):
+        return []
+    
+    game_name = games[game_index]
+    
+    # Return cached data if available
+    if not force_refresh and game_name in _station_files_cache:
+        return _station_files_cache[game_name]
+    
+    game_path = os.path.join(SHARED_BASE_PATH, game_name)
+    
+    try:
+        mp3_files = sorted([f for f in os.listdir(game_path) if f.lower().endswith('.mp3')])
+    except PermissionError:
+        print(f"Permission denied accessing: {game_path}")
+        mp3_files = []
+    
+    _station_files_cache[game_name] = mp3_files
+    return mp3_files
+
+def extract_mp3_cover(mp3_path, station_name, game_path):
+    """Extract embedded cover art from MP3 file and save as image"""
+    try:
+        audio = File(mp3_path, easy=True)
+        if audio is None:
+            return None
+        
+        cover_data = None
+        mime_type = 'image/jpeg'  # default
+        
+        # Method 1: ID3v2 APIC frames
+        try:
+            id3 = ID3(mp3_path)
+            pictures = [tag for tag in id3.values() if isinstance(tag, APIC)]
+            if pictures:
+                cover_data = pictures[0].data
+                mime_type = pictures[0].mime
+                print(f"Found ID3v2 cover art in {mp3_path}")
+        except Exception as e:
+            pass
+        
+        # Method 2: Check common tags in easyid3
+        if not cover_data and hasattr(audio, 'tags'):
+            cover_tags = [
+                'APIC:', 'cover', 'coverart', 'albumart', 
+                'metadata_block_picture', 'PICTURE', 'PIC'
+            ]
+            for tag_name in cover_tags:
+                if tag_name in audio.tags:
+                    if hasattr(audio.tags[tag_name], 'data'):
+                        cover_data = audio.tags[tag_name].data
+                    else:
+                        cover_data = audio.tags[tag_name][0]
+                    print(f"Found cover art in tag {tag_name} in {mp3_path}")
+                    break
+        
+        # Method 3: Check for embedded images in any tag
+        if not cover_data and hasattr(audio, 'tags'):
+            for tag in audio.tags.values():
+                if hasattr(tag, 'data') and len(tag.data) > 100:  # Reasonable image size
+                    # Check if it looks like image data
+                    if tag.data.startswith((b'\xff\xd8\xff', b'\x89PNG', b'GIF', b'BM')):
+                        cover_data = tag.data
+                        print(f"Found image data in tag in {mp3_path}")
+                        break
+        
+        if cover_data:
+            # Determine file extension from MIME type or data
+            extension = '.jpg'
+            if 'png' in mime_type.lower() or cover_data.startswith(b'\x89PNG'):
+                extension = '.png'
+            elif 'gif' in mime_type.lower() or cover_data.startswith(b'GIF'):
+                extension = '.gif'
+            elif 'bmp' in mime_type.lower() or cover_data.startswith(b'BM'):
+                extension = '.bmp'
+            
+            # Save extracted cover
+            cover_path = os.path.join(game_path, f"{station_name}_mp3cover{extension}")
+            
+            with open(cover_path, 'wb') as f:
+                f.write(cover_data)
+            
+            print(f"Extracted cover art: {cover_path}")
+            return cover_path
+        
+        print(f"No cover art found in {mp3_path}")
+        return None
+        
+    except Exception as e:
+        print(f"Error extracting cover art from {mp3_path}: {e}")
+        return None
+
+def get_mp3_cover_path(game_index, display_index):
+    """Get cover art path from MP3 file"""
+    games = get_available_games()
+    if game_index >= len(games):
+        return None
+    
+    game_name = games[game_index]
+    game_path = os.path.join(SHARED_BASE_PATH, game_name)
+    
+    station_files = get_station_files(game_index)
+    station_index = display_index - 1
+    
+    if station_index < len(station_files):
+        mp3_file = station_files[station_index]
+        station_name = os.path.splitext(mp3_file)[0]
+        mp3_path = os.path.join(game_path, mp3_file)
+        
+        if os.path.exists(mp3_path):
+            # First check if we already extracted this cover
+            existing_covers = [
+                f for f in os.listdir(game_path) 
+                if f.startswith(f"{station_name}_mp3cover") or f.startswith(f"{station_name}_cover")
+            ]
+            if existing_covers:
+                return os.path.join(game_path, existing_covers[0])
+            
+            # Extract fresh cover art
+            return extract_mp3_cover(mp3_path, station_name, game_path)
+    
+    return None
+
+def get_image_path(game_index, display_index, force_refresh=False):
+    """Get the path to the appropriate image based on game and station with caching"""
+    games = get_available_games(force_refresh)
+    if game_index >= len(games):
+        return None
+    
+    game_name = games[game_index]
+    game_path = os.path.join(SHARED_BASE_PATH, game_name)
+    
+    # If display_index is 0, show game logo
+    if display_index == 0:
+        # Look for common game logo names
+        game_logo_names = ['game.png', 'game.jpg', 'logo.png', 'logo.jpg', 
+                          f'{game_name}.png', f'{game_name}.jpg',
+                          'cover.png', 'cover.jpg', 'default.png']
+        for logo_name in game_logo_names:
+            logo_path = os.path.join(game_path, logo_name)
+            if os.path.exists(logo_path):
+                return logo_path
+        # If no game logo found, create a default one
+        return create_default_game_image(game_name, game_path)
+    
+    # For stations (display_index >= 1), get the station image
+    station_files = get_station_files(game_index, force_refresh)
+    station_index = display_index - 1  # Convert to 0-based station index
+    
+    if station_index >= len(station_files):
+        return None
+    
+    mp3_file = station_files[station_index]
+    station_name = os.path.splitext(mp3_file)[0]
+    
+    # Look for image with same name as MP3
+    image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp']
+    for ext in image_extensions:
+        image_path = os.path.join(game_path, station_name + ext)
+        if os.path.exists(image_path):
+            return image_path
+    
+    # Also check for images without spaces/special characters
+    simple_name = station_name.replace(' ', '').replace('-', '').lower()
+    for ext in image_extensions:
+        try:
+            for file in os.listdir(game_path):
+                if (file.lower().startswith(simple_name) and 
+                    file.lower().endswith(ext) and
+                    not file.lower().endswith('.mp3')):
+                    image_path = os.path.join(game_path, file)
+                    return image_path
+        except PermissionError:
+            continue
+    
+    # If no station image found, create a default one
+    return create_default_station_image(station_name, game_path)
+
+def get_image_path_with_priority(game_index, display_index, force_refresh=False):
+    """
+    Get image path with priority:
+    1. Dedicated image file (PNG, JPG, etc.)
+    2. Embedded MP3 cover art
+    3. Default generated image
+    """
+    # Priority 1: Dedicated image file
+    image_path = get_image_path(game_index, display_index, force_refresh)
+    if image_path and os.path.exists(image_path):
+        return image_path
+    
+    # Priority 2: MP3 cover art (only for stations, not game logos)
+    if display_index > 0:
+        mp3_cover_path = get_mp3_cover_path(game_index, display_index)
+        if mp3_cover_path:
+            return mp3_cover_path
+    
+    # Priority 3: Default generated image (already handled in get_image_path)
+    return image_path
+
+def get_display_names(game_index, display_index):
+    """Get (game name, station name) for a display index, station name is '' for the game logo"""
+    games = get_available_games()
+    if game_index < 0 or game_index >= len(games):
+        return None
+    if display_index == 0:
+        return games[game_index], ''
+    station_files = get_station_files(game_index)
+    if display_index - 1 >= len(station_files):
+        return None
+    return games[game_index], os.path.splitext(station_files[display_index - 1])[0]
+
+def load_display_image(image_path):
+    """Open an image and bring it to display size and RGB mode"""
+    image = Image.open(image_path)
+    if image.size != DISPLAY_SIZE:
+        image = image.resize(DISPLAY_SIZE, Image.Resampling.LANCZOS)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+def clear_library_cache():
+    """Clear the cached game and station listings"""
+    global _games_cache, _station_files_cache, _ticker_text_cache, _last_cache_update
+    _games_cache = None
+    _station_files_cache = {}
+    _ticker_text_cache = {}
+    _last_cache_update = 0
+
+# Default image creation functions
+def create_default_game_image(game_name, game_path):
+    """Create a default game logo image"""
+    try:
+        pix = text.text_frame(*DISPLAY_SIZE, color565('navy'))
+        font = text.atlas(size=24)
+        font.draw(pix, game_name, 120, 100, color565('white'), anchor="mm")
+        font.draw(pix, "RADIO", 120, 130, color565('yellow'), anchor="mm")
+        
+        default_path = os.path.join(game_path, "default_game.png")
+        Image.fromarray(frame.from_rgb565(pix)).save(default_path)
+        return default_path
+    except Exception as e:
+        print(f"Error creating default game image: {e}")
+        return None
+
+def create_default_station_image(station_name, game_path):
+    """Create a default station image"""
+    try:
+        pix = text.text_frame(*DISPLAY_SIZE, color565('darkgreen'))
+        font = text.atlas(size=20)
+        lines = wrap_words(station_name, TICKER_MIN_LENGTH)
+        
+        # Draw text lines
+        y_pos = 100 - (len(lines) * 12)
+        for line in lines:
+            font.draw(pix, line, 120, y_pos, color565('white'), anchor="mm")
+            y_pos += 24
+        
+        default_path = os.path.join(game_path, f"{station_name}.png")
+        info = PngImagePlugin.PngInfo()
+        info.add_text(GENERATED_IMAGE_KEY, station_name)
+        Image.fromarray(frame.from_rgb565(pix)).save(default_path, pnginfo=info)
+        return default_path
+    except Exception as e:
+        print(f"Error creating default station image: {e}")
+        return None
+
+def create_ticker_strip(station_name, band_rows):
+    """Render a station name as an RGB565 strip of lines for the scrolling ticker
+
+    A blank band follows the text so the loop restarts on an empty band.
+    """
+    font = text.atlas(size=20)
+    lines = wrap_words(station_name, TICKER_MIN_LENGTH)
+    pix = text.text_frame(DISPLAY_SIZE[0], len(lines) * TICKER_LINE_HEIGHT + band_rows, color565('darkgreen'))
+    y_pos = TICKER_LINE_HEIGHT // 2
+    for line in lines:
+        font.draw(pix, line, DISPLAY_SIZE[0] // 2, y_pos, color565('white'), anchor="mm")
+        y_pos += TICKER_LINE_HEIGHT
+    return pix
+
+def get_station_ticker_text(game_index, display_index):
+    """Station name to show as a scrolling ticker, None if the station has its own image or a short name
+
+    Cached per station until clear_library_cache, so only the first display
+    of a station probes its image file. The cache is keyed by the game and
+    station names, as indices move when the library listing changes.
+    """
+    names = get_display_names(game_index, display_index)
+    if not names or len(names[1]) < TICKER_MIN_LENGTH:
+        return None
+    if names not in _ticker_text_cache:
+        _ticker_text_cache[names] = _find_station_ticker_text(game_index, display_index, names[1])
+    return _ticker_text_cache[names]
+
+def _find_station_ticker_text(game_index, display_index, station_name):
+    image_path = get_image_path_with_priority(game_index, display_index)
+    if not image_path or not os.path.exists(image_path):
+        return None
+    try:
+        with Image.open(image_path) as image:
+            generated = GENERATED_IMAGE_KEY in image.info
+    except Exception:
+        return None
+    return station_name if generated else None
+
+def color565(name):
+    """RGB565 value of a PIL color name or #rrggbb string"""
+    return frame.rgb565(*ImageColor.getrgb(name)[:3])
+
+@functools.lru_cache(maxsize=256)
+def wrap_words(words, max_chars):
+    """Split text into a tuple of lines shorter than max_chars, breaking at spaces; results are cached"""
+    lines = []
+    current_line = ""
+    for word in words.split():
+        test_line = current_line + " " + word if current_line else word
+        if len(test_line) < max_chars:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return tuple(lines)
\ No newline at end of file
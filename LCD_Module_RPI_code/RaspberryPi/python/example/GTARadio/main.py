@@ -17,8 +17,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 from lib import LCD_1inch28
 from PIL import Image, ImageDraw, ImageFont
 
-from display import display_image, display_image_delay, clear_display_cache
-from radio import play_radio, get_radio_stations, clear_cache, update_playback_position, reset_playback_position, get_current_position
+from display import display_image, display_image_delay, clear_display_cache, note_activity, show_progress
+from radio import play_radio, get_radio_stations, clear_cache, update_playback_position, reset_playback_position, get_current_position, get_current_duration
 from settings import settings_manager
 
 # Always use this directory
@@ -63,6 +63,8 @@ ROTATION_DEBOUNCE = 0.005  # 5ms for rotation
 BUTTON_DEBOUNCE = 0.005     # 50ms for button
 DOUBLE_CLICK_TIME = 0.5    # 500ms for double click
 
+PROGRESS_INTERVAL = 1.0    # seconds between progress ring updates
+
 # Pre-cache data on startup
 print("Pre-caching file structure...")
 get_radio_stations(force_refresh=True)
@@ -281,6 +283,10 @@ def terminal_control():
             if key is None:
                 time.sleep(0.01)
                 continue
+
+            if note_activity():
+                # The first key on a sleeping display only wakes it
+                continue
                 
             if key in ['q', 'Q']:
                 print("\nShutting down...")
@@ -357,7 +363,10 @@ def read_rotary_encoder():
     if clk_state != clk_last_state:
         # When CLK changes, check DT to determine direction
         if clk_state == 0:  # CLK falling edge
-            if dt_state == 0:
+            if note_activity():
+                # The first detent on a sleeping display only wakes it
+                last_rotation_time = current_time
+            elif dt_state == 0:
                 # Clockwise rotation
                 if settings_manager.in_settings:
                     handle_settings_navigation('next')
@@ -391,8 +400,10 @@ def read_button():
         button_state_stable = GPIO.input(BUTTON_PIN)
         
         if button_state_stable == GPIO.LOW:
-            # Valid button press
-            if current_time - last_button_press_time < DOUBLE_CLICK_TIME:
+            # Valid button press, the first one on a sleeping display only wakes it
+            if note_activity():
+                print("Button: wake display")
+            elif current_time - last_button_press_time < DOUBLE_CLICK_TIME:
                 # Double click detected - switch game
                 if not settings_manager.in_settings:
                     next_game()
@@ -441,12 +452,16 @@ if get_station_count(game_index) > 0:
 
 try:
     last_position_update = time.time()
+    last_progress_update = 0
     while True:
         # Update playback position periodically
         current_time = time.time()
         if current_time - last_position_update >= 0.1:  # Update every 100ms
             update_playback_position()
             last_position_update = current_time
+        if current_time - last_progress_update >= PROGRESS_INTERVAL:
+            show_progress(get_current_position(), get_current_duration())
+            last_progress_update = current_time
         
         # Keep the main thread alive and print status occasionally
         time.sleep(0.05)  # Reduced sleep for more responsive position updates
@@ -15,6 +15,7 @@ CACHE_TIMEOUT = 30  # seconds
 
 # Global playback position tracking
 _current_playback_position = 0  # in seconds
+_current_duration = 0  # of the playing file, 0 before the first playback
 _first_playback = True
 
 def get_radio_stations(force_refresh=False):
@@ -106,7 +107,7 @@ def clear_cache():
     print("Cache cleared")
 
 def play_radio(game_index, station_index):
-    global mp3_process, _current_playback_position, _first_playback
+    global mp3_process, _current_playback_position, _current_duration, _first_playback
     
     # Get available stations from cache
     stations, mp3_durations = get_radio_stations()
@@ -138,6 +139,7 @@ def play_radio(game_index, station_index):
     
     # Get duration of the selected song
     duration = mp3_durations.get(selected_song, 300)
+    _current_duration = duration
     
     # Calculate start position
     if _first_playback:
@@ -190,4 +192,8 @@ def reset_playback_position():
 
 def get_current_position():
     """Get the current playback position"""
-    return _current_playback_position
\ No newline at end of file
+    return _current_playback_position
+
+def get_current_duration():
+    """Duration in seconds of the file that is playing, 0 if nothing was played yet"""
+    return _current_duration
@@ -1,7 +1,7 @@
 import os
 import sys
 import subprocess
-from display import display_image, show_default_image, clear_display_cache
+from display import display_image, show_default_image, set_backlight_level
 from radio import get_radio_stations, mp3_process, reset_playback_position
 
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), 'assets')
@@ -57,6 +57,7 @@ class SettingsManager:
         except Exception as e:
             print(f"Error loading brightness level: {e}")
             self.current_brightness_index = 2
+        set_backlight_level(self.current_brightness_index)
     
     def save_brightness_level(self):
         """Save the current brightness level to storage"""
@@ -73,16 +74,15 @@ class SettingsManager:
         new_brightness_index = (self.current_brightness_index + 1) % 5  # 0-4
         print(f"Cycling brightness from {self.current_brightness_index} to {new_brightness_index}")
         
-        # Update brightness level
+        # Update brightness level, the backlight does the dimming so cached
+        # frames stay valid
         self.current_brightness_index = new_brightness_index
+        set_backlight_level(new_brightness_index)
         self.save_brightness_level()
         
         # Update the settings list with new brightness image
         self.update_brightness_setting()
         
-        # Clear display cache to force redraw of all images with new brightness
-        clear_display_cache()
-        
         # Refresh current display
         if self.in_settings and not self.in_playlist_select:
             self.show_current_setting()
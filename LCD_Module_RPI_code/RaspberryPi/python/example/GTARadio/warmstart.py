@@ -0,0 +1,126 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""Warm restart: take over a panel that is still initialised from the last run
+
+The panel keeps its configuration and picture for as long as it has power,
+so a restart of the radio (crash, update, systemctl restart) does not need
+the reset pulse and init tables, which blank the glass to white. After each
+Init the panel settings are written to a state file, and the station frame
+on the glass is saved next to it; the next process compares the settings
+with its own, calls disp.Resume() instead of Init and shows the saved frame
+at once. Frames are saved by a background thread, only once one has stayed
+on the glass for SAVE_DELAY seconds (or on flush()), so browsing through
+stations costs the display worker nothing.
+
+The state lives in /dev/shm, which is cleared with the power cycle that also
+resets the panel. GTARADIO_STATE_DIR moves it, GTARADIO_COLD_START=1 forces
+a full Init.
+"""
+import os
+import json
+import time
+import threading
+import numpy as np
+
+STATE_DIR = os.environ.get('GTARADIO_STATE_DIR', '/dev/shm/gtaradio')
+STATE_PATH = os.path.join(STATE_DIR, 'panel.json')
+FRAME_PATH = os.path.join(STATE_DIR, 'frame.rgb565')
+SAVE_DELAY = 5.0  # seconds a frame stays on the glass before it is saved
+
+# Frame waiting for the saver thread, and when it was shown
+_pending = None
+_pending_since = 0
+_save_now = False
+_save_cond = threading.Condition()
+_saver = None
+
+def panel_state(disp):
+    """Settings of disp that the panel keeps across processes"""
+    return {'panel': type(disp).__name__,
+            'width': disp.width,
+            'height': disp.height,
+            'color_bits': getattr(disp, 'color_bits', 16),
+            'rotation': getattr(disp, 'rotation', 0),
+            'mirror': getattr(disp, 'mirror', False)}
+
+def _write(path, data):
+    """Replace a file in one step, a reader never sees half of it"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def can_resume(disp):
+    """True if the panel was initialised by an earlier run with the same settings"""
+    if os.environ.get('GTARADIO_COLD_START'):
+        return False
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f) == panel_state(disp)
+    except (OSError, ValueError):
+        return False
+
+def mark_initialised(disp):
+    """Record that the panel is initialised with the settings of disp"""
+    _write(STATE_PATH, json.dumps(panel_state(disp)).encode())
+
+def forget():
+    """Drop the state, the next start initialises the panel"""
+    for path in (STATE_PATH, FRAME_PATH):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def save_frame(pix):
+    """Keep the RGB565 frame on the glass for the next start, returns at once
+
+    The frame must not be changed afterwards. It is written by the saver
+    thread once SAVE_DELAY seconds pass without a newer frame.
+    """
+    global _pending, _pending_since, _saver
+    with _save_cond:
+        _pending = pix
+        _pending_since = time.monotonic()
+        if _saver is None:
+            _saver = threading.Thread(target=_save_worker, name='warmstart-save', daemon=True)
+            _saver.start()
+        _save_cond.notify()
+
+def flush():
+    """Write the pending frame now (on the saver thread), e.g. before the display goes to sleep"""
+    global _save_now
+    with _save_cond:
+        _save_now = True
+        _save_cond.notify()
+
+def _save_worker():
+    global _pending, _save_now
+    while True:
+        with _save_cond:
+            while True:
+                if _pending is None:
+                    _save_now = False
+                    _save_cond.wait()
+                    continue
+                remaining = _pending_since + SAVE_DELAY - time.monotonic()
+                if _save_now or remaining <= 0:
+                    break
+                _save_cond.wait(remaining)
+            pix, _pending, _save_now = _pending, None, False
+        try:
+            _write(FRAME_PATH, np.ascontiguousarray(pix, dtype='>u2').tobytes())
+        except OSError as e:
+            print(f"Could not save frame for warm restart: {e}")
+
+def load_frame(width, height):
+    """The frame saved by save_frame as a HxW '>u2' array, None if there is none of that size"""
+    try:
+        with open(FRAME_PATH, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) != width * height * 2:
+        return None
+    return np.frombuffer(data, dtype='>u2').reshape(height, width)
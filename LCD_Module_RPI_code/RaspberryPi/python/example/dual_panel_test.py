@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+# Two panels from one process: the round 1.28inch on CE0 and the 2inch on
+# CE1 with its own RST/DC/BL pins. Both share one conversion pool and frame
+# cache; each has its own output thread. show() returns at once, the
+# conversion future is only waited for here to time it.
+import sys
+import time
+import logging
+sys.path.append("..")
+from lib import LCD_1inch28, LCD_2inch
+from lib.multipanel import PanelManager
+from PIL import Image
+
+# Second panel pin configuration (the first one uses the defaults)
+STATUS_SPI = (0, 1)
+STATUS_RST = 5
+STATUS_DC = 6
+STATUS_BL = 13
+
+logging.basicConfig(level=logging.DEBUG)
+
+round_disp = LCD_1inch28.LCD_1inch28()
+status_disp = LCD_2inch.LCD_2inch(spi=STATUS_SPI, rst=STATUS_RST, dc=STATUS_DC, bl=STATUS_BL)
+for disp in (round_disp, status_disp):
+    disp.Init()
+    disp.clear()
+    disp.bl_DutyCycle(50)
+
+manager = PanelManager()
+manager.add('round', round_disp)
+manager.add('status', status_disp, size=(status_disp.height, status_disp.width))  # landscape
+
+try:
+    for i in range(3):
+        path = '../pic/LCD_1inch28_%d.jpg' % (i + 1)
+        start = time.perf_counter()
+        futures = [manager.show('round', path, lambda: Image.open(path)),
+                   manager.show('status', path, lambda: Image.open(path))]
+        logging.info("%s handed over in %.2f ms", path, (time.perf_counter() - start) * 1000)
+        for future in futures:
+            future.result()
+        logging.info("%s converted in %.1f ms", path, (time.perf_counter() - start) * 1000)
+        time.sleep(2)
+    # Second round comes from the shared cache
+    start = time.perf_counter()
+    manager.show('round', '../pic/LCD_1inch28_1.jpg', None)
+    logging.info("cached frame handed over in %.2f ms", (time.perf_counter() - start) * 1000)
+    time.sleep(2)
+    manager.close()
+    round_disp.module_exit()
+    status_disp.module_exit()
+except KeyboardInterrupt:
+    manager.close()
+    round_disp.module_exit()
+    status_disp.module_exit()
+    exit()
@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+# Cost of the DC/RST toggle path per GPIO backend: raw pin on/off pairs,
+# digital_write pairs and whole register writes (command byte plus four
+# parameter bytes with the bus disconnected, so only the Python and GPIO
+# side is timed). Run it on each board to pick LCD_BACKEND.
+import sys
+import time
+import logging
+import argparse
+sys.path.append("..")
+from lib import lcdconfig
+
+logging.basicConfig(level=logging.INFO)
+
+DC = 25
+RST = 27
+BL = 18
+
+def per_call(func, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1e9
+
+def bench(name, count):
+    backend = lcdconfig.create_backend(name, DC)
+    disp = lcdconfig.RaspberryPi(spi=None, rst=RST, dc=DC, bl=BL, backend=backend)
+    pin = disp.DC_PIN
+    try:
+        def toggle():
+            pin.on()
+            pin.off()
+        def digital_write():
+            disp.digital_write(pin, True)
+            disp.digital_write(pin, False)
+        def register():
+            disp.write_register(0x2A, [0, 0, 0, 239])
+        return {'toggle': per_call(toggle, count),
+                'digital_write': per_call(digital_write, count),
+                'write_register': per_call(register, count)}
+    finally:
+        for p in (disp.RST_PIN, disp.DC_PIN, disp.BL_PIN):
+            p.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time DC toggles through each GPIO backend')
+    parser.add_argument('--count', type=int, default=20000, help='calls per measurement')
+    parser.add_argument('--backends', nargs='+', default=['gpiozero', 'rpigpio', 'lgpio', 'mock'],
+                        choices=lcdconfig.BACKENDS)
+    args = parser.parse_args()
+
+    for name in args.backends:
+        try:
+            result = bench(name, args.count)
+        except Exception as e:
+            logging.info("%-9s unavailable: %s", name, e)
+            continue
+        logging.info("%-9s %8.0f ns/toggle  %8.0f ns/digital_write pair  %8.0f ns/register write",
+                     name, result['toggle'], result['digital_write'], result['write_register'])
@@ -0,0 +1,139 @@
+import numpy as np
+from . import frame
+
+class Layer:
+    """An RGB565 image with an alpha mask, placed at (x, y) over the base frame"""
+
+    def __init__(self, pix, alpha, x, y):
+        self.pix = pix
+        self.alpha = alpha
+        self.x = x
+        self.y = y
+
+    @property
+    def box(self):
+        height, width = self.pix.shape
+        return self.x, self.y, self.x + width, self.y + height
+
+class Compositor:
+    """Widgets layered over a base frame, sent to the display tile by tile
+
+    The base is a cached RGB565 frame (a station logo) that is already on
+    the glass. Placing, replacing or removing a layer marks the tiles under
+    the non-transparent pixels of its old and new image dirty; flush()
+    recomposes only those tiles and sends them as one window per run of
+    adjacent dirty tiles in a tile row. Layers are drawn in the order they
+    were first placed. A layer changed in place (see place_pixels) is
+    redrawn where invalidate() marks it.
+    """
+
+    def __init__(self, disp, tile=16):
+        self.disp = disp
+        self.tile = tile
+        self.layers = {}
+        self.base = None
+        self.frame = None
+        self._dirty = None
+
+    def set_base(self, pix, shown=True):
+        """Use an RGB565 frame as the base, shown=True if it is already on the glass without layers"""
+        self.base = pix
+        self.frame = np.array(pix, dtype='>u2')
+        height, width = pix.shape
+        t = self.tile
+        self._dirty = np.zeros(((height + t - 1) // t, (width + t - 1) // t), dtype=bool)
+        if not shown:
+            self._dirty[...] = True
+        for layer in self.layers.values():
+            self._mark_layer(layer)
+
+    def clear_base(self):
+        """Forget the base, e.g. after another screen replaced it, layers are kept"""
+        self.base = self.frame = self._dirty = None
+
+    def place(self, name, image, x, y):
+        """Add or replace a layer from a PIL image (transparency is kept) at (x, y)"""
+        self.place_pixels(name, *frame.to_rgb565_alpha(image), x, y)
+
+    def place_pixels(self, name, pix, alpha, x, y):
+        """Add or replace a layer from an RGB565 array and a uint8 alpha mask of the same shape
+
+        The arrays are used as they are, not copied: a caller that changes
+        them afterwards reports the changed regions with invalidate().
+        """
+        old = self.layers.get(name)
+        if old is not None:
+            self._mark_layer(old)
+        self.layers[name] = layer = Layer(pix, alpha, x, y)
+        self._mark_layer(layer)
+
+    def remove(self, name):
+        """Remove a layer, the base shows through again on the next flush"""
+        layer = self.layers.pop(name, None)
+        if layer is not None:
+            self._mark_layer(layer)
+
+    def invalidate(self, rects):
+        """Mark frame regions (x0, y0, x1, y1) dirty, e.g. where a layer changed in place"""
+        for rect in rects:
+            self._mark(rect)
+
+    def dirty_rects(self):
+        """Windows (x0, y0, x1, y1) covering the dirty tiles, one per horizontal run"""
+        if self._dirty is None:
+            return []
+        height, width = self.frame.shape
+        t = self.tile
+        rects = []
+        for row in np.flatnonzero(self._dirty.any(axis=1)):
+            cols = np.flatnonzero(self._dirty[row])
+            for run in np.split(cols, np.flatnonzero(np.diff(cols) > 1) + 1):
+                rects.append((int(run[0]) * t, int(row) * t,
+                              min(width, (int(run[-1]) + 1) * t), min(height, (int(row) + 1) * t)))
+        return rects
+
+    def flush(self):
+        """Recompose and send the dirty tiles, returns the number of pixels sent"""
+        rects = self.dirty_rects()
+        if not rects:
+            return 0
+        for rect in rects:
+            self._compose(rect)
+        self.disp.ShowRects(self.frame, rects)
+        self._dirty[...] = False
+        return sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+
+    def _compose(self, rect):
+        x0, y0, x1, y1 = rect
+        out = self.base[y0:y1, x0:x1].copy()
+        for layer in self.layers.values():
+            lx0, ly0, lx1, ly1 = layer.box
+            ix0, iy0, ix1, iy1 = max(x0, lx0), max(y0, ly0), min(x1, lx1), min(y1, ly1)
+            if ix0 >= ix1 or iy0 >= iy1:
+                continue
+            src = (slice(iy0 - ly0, iy1 - ly0), slice(ix0 - lx0, ix1 - lx0))
+            dst = (slice(iy0 - y0, iy1 - y0), slice(ix0 - x0, ix1 - x0))
+            out[dst] = frame.blend_rgb565(out[dst], layer.pix[src], layer.alpha[src])
+        self.frame[y0:y1, x0:x1] = out
+
+    def _mark_layer(self, layer):
+        """Mark the tiles under the pixels of a layer that are not fully transparent"""
+        if self._dirty is None:
+            return
+        ys, xs = np.nonzero(layer.alpha)
+        rows, cols = self._dirty.shape
+        ys = (ys + layer.y) // self.tile
+        xs = (xs + layer.x) // self.tile
+        inside = (ys >= 0) & (ys < rows) & (xs >= 0) & (xs < cols)
+        self._dirty[ys[inside], xs[inside]] = True
+
+    def _mark(self, box):
+        if self._dirty is None:
+            return
+        x0, y0, x1, y1 = box
+        rows, cols = self._dirty.shape
+        t = self.tile
+        x0, y0 = max(0, x0 // t), max(0, y0 // t)
+        x1, y1 = min(cols, -(-x1 // t)), min(rows, -(-y1 // t))
+        if x0 < x1 and y0 < y1:
+            self._dirty[y0:y1, x0:x1] = True
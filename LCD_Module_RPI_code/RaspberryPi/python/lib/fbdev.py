@@ -0,0 +1,170 @@
+import os
+import mmap
+import logging
+import numpy as np
+from . import frame
+
+def framebuffer_info(path):
+    """(width, height, bits per pixel, stride) of a framebuffer device from sysfs, None if unknown"""
+    sysfs = os.path.join('/sys/class/graphics', os.path.basename(path))
+    try:
+        def read(name):
+            with open(os.path.join(sysfs, name)) as f:
+                return f.read().strip()
+        width, height = (int(v) for v in read('virtual_size').split(','))
+        return width, height, int(read('bits_per_pixel')), int(read('stride'))
+    except (OSError, ValueError):
+        return None
+
+class FramebufferDisplay:
+    """Display output through an mmap of a kernel framebuffer (fbtft, panel-mipi-dbi)
+
+    The kernel driver owns the panel: it runs the init sequence and moves
+    written pages to the panel over SPI with DMA, so a frame is a memory
+    copy here. Offers the frame methods of panel.Panel for portrait frames;
+    there is no hardware scrolling (scroll_lines is 0).
+
+    path is a /dev/fbN device, whose geometry comes from sysfs, or a plain
+    file of width x height RGB565 pixels (created if needed), for running
+    without the hardware. backlight is the name of a sysfs backlight
+    device (/sys/class/backlight/<name>), or the full path of its directory.
+    """
+    color_bits = 16
+    circle_bands = 0
+    partial_update = False
+    scroll_lines = 0
+    asleep = False
+    _horizontal = 0
+
+    def __init__(self, path='/dev/fb1', width=None, height=None, backlight=None):
+        info = framebuffer_info(path)
+        if info is not None:
+            width, height, bits, stride = info
+            if bits != 16:
+                raise ValueError('{0} is {1} bits per pixel, only RGB565 is supported'.format(path, bits))
+        elif width is None or height is None:
+            raise ValueError('No framebuffer geometry for {0}, pass width and height'.format(path))
+        else:
+            stride = width * 2
+        self.path = path
+        self.width = width
+        self.height = height
+        # /sys/class/backlight/<name> directory, None if the backlight is not dimmable
+        self.backlight = None
+        if backlight is not None:
+            self.backlight = os.path.join('/sys/class/backlight', backlight)
+            try:
+                with open(os.path.join(self.backlight, 'max_brightness')) as f:
+                    self._max_brightness = int(f.read())
+            except (OSError, ValueError) as e:
+                raise ValueError('No sysfs backlight at {0}: {1}'.format(self.backlight, e))
+
+        size = stride * height
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        try:
+            if os.path.isfile(path) and os.fstat(self._file.fileno()).st_size < size:
+                self._file.truncate(size)
+            self._mm = mmap.mmap(self._file.fileno(), size)
+        except Exception:
+            self._file.close()
+            raise
+        # Framebuffers hold native (little-endian) RGB565, assigning a '>u2'
+        # frame swaps the bytes on the way in
+        self.buffer = np.ndarray((height, stride // 2), dtype='<u2', buffer=self._mm)[:, :width]
+
+    def Init(self):
+        """Nothing to program, the kernel driver initialised the panel"""
+        logging.debug("framebuffer %s: %dx%d", self.path, self.width, self.height)
+
+    def Resume(self):
+        """Same as Init, the kernel driver keeps the panel running between processes"""
+        self.Init()
+
+    def Sleep(self):
+        """Blank the framebuffer (the kernel driver puts the panel to sleep), the contents are kept"""
+        self._blank(1)
+        self.asleep = True
+
+    def Wake(self):
+        """Unblank the framebuffer"""
+        self._blank(0)
+        self.asleep = False
+
+    def _blank(self, level):
+        try:
+            with open(os.path.join('/sys/class/graphics', os.path.basename(self.path), 'blank'), 'w') as f:
+                f.write(str(level))
+        except OSError:
+            pass
+
+    def _check(self, pix):
+        if pix.shape[:2] != (self.height, self.width):
+            raise ValueError('Image must be same dimensions as display \
+                ({0}x{1}).' .format(self.width, self.height))
+
+    def ShowImage(self, Image):
+        """Write a PIL image, HxWx3 uint8 array or pre-encoded RGB565 data (see Panel.ShowImage)"""
+        if frame.is_rgb565(Image):
+            self.ShowFrame(frame.rgb565_frame(Image, self.width, self.height))
+        else:
+            self.ShowFrame(frame.to_rgb565(Image))
+
+    def ShowFrame(self, pix):
+        """Write an RGB565 frame (height x width, big-endian) to the framebuffer"""
+        self._check(pix)
+        self.buffer[...] = pix
+
+    def ShowChanges(self, pix, previous):
+        """Write only the rows that differ from `previous`, so fewer pages are marked dirty"""
+        self._check(pix)
+        if previous.shape != pix.shape:
+            self.ShowFrame(pix)
+            return
+        self.ShowRects(pix, frame.dirty_rects(previous, pix))
+
+    def ShowRects(self, pix, rects):
+        """Write rectangles (x0, y0, x1, y1) of a full RGB565 frame"""
+        for x0, y0, x1, y1 in rects:
+            self.buffer[y0:y1, x0:x1] = pix[y0:y1, x0:x1]
+
+    def ShowRegion(self, Image, Xstart, Ystart):
+        """Write an image smaller than the screen with its top left corner at (Xstart, Ystart)"""
+        imwidth, imheight = frame.image_size(Image)
+        if Xstart < 0 or Ystart < 0 or Xstart + imwidth > self.width or Ystart + imheight > self.height:
+            raise ValueError('Region {0}x{1} at ({2},{3}) is outside the display ({4}x{5})'.format(
+                imwidth, imheight, Xstart, Ystart, self.width, self.height))
+        if frame.is_rgb565(Image):
+            pix = frame.rgb565_frame(Image, imwidth, imheight)
+        else:
+            pix = frame.to_rgb565(Image)
+        self.buffer[Ystart:Ystart + imheight, Xstart:Xstart + imwidth] = pix
+
+    def SetRotation(self, rotation, mirror=False):
+        """Rotation is set on the kernel driver (its rotate= parameter), not per frame"""
+        if rotation or mirror:
+            raise ValueError('Rotate the framebuffer with the driver\'s rotate= parameter')
+
+    def clear(self):
+        """Clear contents of image buffer"""
+        self.clear_color(0xFFFF)
+
+    def clear_color(self, color):
+        """Fill the screen with one RGB565 color"""
+        self.fill_rect(0, 0, self.width, self.height, color)
+
+    def fill_rect(self, x, y, w, h, color):
+        """Fill a rectangle with one RGB565 color"""
+        self.buffer[max(0, y):y + h, max(0, x):x + w] = color
+
+    def bl_DutyCycle(self, duty):
+        """Backlight level in percent through the sysfs backlight class, if one was given"""
+        if self.backlight is None:
+            return
+        with open(os.path.join(self.backlight, 'brightness'), 'w') as f:
+            f.write(str(int(round(self._max_brightness * duty / 100.0))))
+
+    def module_exit(self):
+        logging.debug("framebuffer close")
+        self.buffer = None
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,186 @@
+import numpy as np
+
+def rgb_array(image):
+    """HxWx3 uint8 array of a PIL image or RGB(A) array, without copying where possible"""
+    if hasattr(image, 'mode') and image.mode != 'RGB':
+        image = image.convert('RGB')
+    img = np.asarray(image)
+    if img.ndim != 3 or img.shape[2] < 3:
+        raise ValueError('Image must be RGB, got shape {0}'.format(img.shape))
+    if img.dtype != np.uint8:
+        raise TypeError('RGB arrays must be uint8, got {0}'.format(img.dtype))
+    return img[..., :3]
+
+def is_rgb565(image):
+    """True for pre-encoded RGB565 data: bytes-like objects and 2-D arrays"""
+    return isinstance(image, (bytes, bytearray, memoryview)) or getattr(image, 'ndim', None) == 2
+
+def rgb565_frame(data, width, height):
+    """Validated HxW big-endian RGB565 view of pre-encoded data, never copied
+
+    data is bytes-like (width * height * 2 bytes) or a 2-D '>u2' array.
+    """
+    if isinstance(data, np.ndarray):
+        pix = data
+        if pix.dtype != np.dtype('>u2'):
+            raise TypeError("RGB565 frames must be big-endian '>u2', got {0}".format(pix.dtype.str))
+    else:
+        pix = np.frombuffer(data, dtype='>u2')
+        if pix.size != width * height:
+            raise ValueError('RGB565 data is {0} bytes, expected {1} ({2}x{3})'.format(
+                pix.nbytes, width * height * 2, width, height))
+        pix = pix.reshape(height, width)
+    if pix.shape != (height, width):
+        raise ValueError('RGB565 frame is {0}x{1}, expected {2}x{3}'.format(
+            pix.shape[1], pix.shape[0], width, height))
+    return pix
+
+def image_size(image):
+    """(width, height) of a PIL image or an array of rows"""
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        raise TypeError('Raw RGB565 data has no size, pass a 2-D array')
+    return image.size
+
+def rgb565(r, g, b):
+    """RGB565 value of an 8-bit per channel color"""
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+def to_rgb565(image, out=None):
+    """Convert a PIL image or HxWx3 uint8 array to a big-endian RGB565 array (HxW)
+
+    `out` may be a preallocated HxW '>u2' array to encode into.
+    """
+    img = rgb_array(image)
+    r = img[..., 0].astype(np.uint16)
+    g = img[..., 1].astype(np.uint16)
+    b = img[..., 2].astype(np.uint16)
+    if out is None:
+        out = np.empty(img.shape[:2], dtype='>u2')
+    out[...] = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+    return out
+
+def from_rgb565(pix):
+    """HxWx3 uint8 array of an RGB565 frame, the low bits filled by repeating the high ones"""
+    pix = pix.astype(np.uint16)
+    r = (pix >> 11) & 0x1F
+    g = (pix >> 5) & 0x3F
+    b = pix & 0x1F
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1).astype(np.uint8)
+
+def to_rgb565_alpha(image):
+    """RGB565 frame (see to_rgb565) and HxW uint8 alpha mask of a PIL image with transparency"""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    img = np.asarray(image)
+    return to_rgb565(img), img[..., 3].copy()
+
+def blend_rgb565(dst, src, alpha):
+    """Blend an RGB565 array over another with a uint8 alpha mask (255 = all src), as a new array
+
+    Channels are interpolated in their 5/6/5-bit form, without expanding to RGB888.
+    """
+    a = alpha.astype(np.int32)
+    a += a >> 7                 # 0..256, so 255 reproduces src exactly
+    d = dst.astype(np.int32)
+    s = src.astype(np.int32)
+    out = np.zeros(dst.shape, dtype=np.int32)
+    for shift, mask in ((11, 0x1F), (5, 0x3F), (0, 0x1F)):
+        dc = (d >> shift) & mask
+        out |= (dc + ((((s >> shift) & mask) - dc) * a >> 8)) << shift
+    return out.astype('>u2')
+
+def to_rgb444(image, out=None):
+    """Pack a PIL image or HxWx3 uint8 array as 12-bit RGB444, two pixels in three bytes
+
+    Returns a flat uint8 array of rgb444_size(H*W) bytes. `out` may be a
+    preallocated uint8 array of that size.
+    """
+    img = rgb_array(image)
+    return _pack_rgb444(img[..., 0] >> 4, img[..., 1] >> 4, img[..., 2] >> 4, out)
+
+def rgb565_to_rgb444(pix, out=None):
+    """Repack an RGB565 frame (see to_rgb565) as 12-bit RGB444"""
+    pix = pix.astype(np.uint16)
+    return _pack_rgb444((pix >> 12).astype(np.uint8), ((pix >> 7) & 0xF).astype(np.uint8),
+                        ((pix >> 1) & 0xF).astype(np.uint8), out)
+
+def rgb444_size(pixels):
+    """Bytes for a number of RGB444 pixels, an odd last pixel takes two bytes"""
+    return (pixels * 3 + 1) // 2
+
+def _pack_rgb444(r, g, b, out):
+    # r, g, b are 4-bit channel values. Pixel pairs become RG BR GB bytes.
+    r, g, b = r.ravel(), g.ravel(), b.ravel()
+    pixels = r.size
+    if pixels % 2:
+        pad = np.zeros(1, dtype=np.uint8)
+        r, g, b = np.concatenate((r, pad)), np.concatenate((g, pad)), np.concatenate((b, pad))
+    if out is None:
+        out = np.empty(rgb444_size(pixels), dtype=np.uint8)
+    packed = np.empty(r.size // 2 * 3, dtype=np.uint8) if pixels % 2 else out
+    packed[0::3] = (r[0::2] << 4) | g[0::2]
+    packed[1::3] = (b[0::2] << 4) | r[1::2]
+    packed[2::3] = (g[1::2] << 4) | b[1::2]
+    if packed is not out:
+        out[...] = packed[:out.size]
+    return out
+
+def encode(image, bits, out=None):
+    """Encode a PIL image or HxWx3 array for a color depth, as a flat byte array
+
+    16 bits is RGB565 and 12 bits is RGB444. `out` may be a preallocated
+    uint8 array of encoded_size bytes.
+    """
+    if bits == 12:
+        return to_rgb444(image, out)
+    img = rgb_array(image)
+    if out is not None:
+        out = out.view('>u2').reshape(img.shape[:2])
+    return to_rgb565(img, out).reshape(-1).view(np.uint8)
+
+def encoded_size(pixels, bits):
+    """Bytes for a number of pixels at a color depth (16 or 12 bits)"""
+    return rgb444_size(pixels) if bits == 12 else pixels * 2
+
+def as_buffer(pix):
+    """Flat byte view of an encoded frame, ready for spidev writebytes2"""
+    return memoryview(np.ascontiguousarray(pix)).cast('B')
+
+def dirty_rects(prev, cur, gap=8):
+    """Bounding rectangles (x0, y0, x1, y1) of the row bands where two frames differ
+
+    Changed rows closer than `gap` rows are merged into one band, since a
+    window setup costs more than a few rows of pixels.
+    """
+    changed = prev != cur
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return []
+    rects = []
+    for band in np.split(rows, np.flatnonzero(np.diff(rows) > gap) + 1):
+        y0, y1 = int(band[0]), int(band[-1]) + 1
+        cols = np.flatnonzero(changed[y0:y1].any(axis=0))
+        rects.append((int(cols[0]), y0, int(cols[-1]) + 1, y1))
+    return rects
+
+def circle_spans(width, height):
+    """Per-row (x0, x1) spans of the pixels inside the circle inscribed in the panel"""
+    cx, cy, r = width / 2.0, height / 2.0, min(width, height) / 2.0
+    dy = np.arange(height) + 0.5 - cy
+    half = np.sqrt(np.clip(r * r - dy * dy, 0, None))
+    x0 = np.clip(np.ceil(cx - half - 0.5), 0, width).astype(int)
+    x1 = np.clip(np.floor(cx + half - 0.5) + 1, 0, width).astype(int)
+    return list(zip(x0.tolist(), x1.tolist()))
+
+def circle_bands(width, height, count):
+    """Split the inscribed circle into `count` row bands of windows (x0, y0, x1, y1)"""
+    spans = circle_spans(width, height)
+    edges = np.linspace(0, height, count + 1).round().astype(int).tolist()
+    windows = []
+    for y0, y1 in zip(edges[:-1], edges[1:]):
+        band = [s for s in spans[y0:y1] if s[1] > s[0]]
+        if y1 > y0 and band:
+            windows.append((min(s[0] for s in band), y0, max(s[1] for s in band), y1))
+    return windows
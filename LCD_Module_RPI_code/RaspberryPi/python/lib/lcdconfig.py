@@ -30,36 +30,259 @@
 import os
 import sys
 import time
-import spidev
 import logging
+import queue
+import threading
+import functools
 import numpy as np
-from gpiozero import *
+from . import frame
+
+# Hardware modules are only needed by the backends that use them, so the
+# library can be imported (and run on the simulator) without them
+try:
+    import spidev
+except ImportError:
+    spidev = None
+try:
+    from gpiozero import DigitalOutputDevice, DigitalInputDevice, PWMOutputDevice
+except ImportError:
+    DigitalOutputDevice = DigitalInputDevice = PWMOutputDevice = None
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    GPIO = None
+try:
+    import lgpio
+except ImportError:
+    lgpio = None
+
+class SpidevBackend:
+    """Bus half of the hardware backends, the pins are up to the subclass"""
+
+    def open_spi(self, bus, device):
+        if spidev is None:
+            raise RuntimeError('spidev is not installed, use LCD_BACKEND=sim to run without hardware')
+        return spidev.SpiDev(bus, device)
+
+class FastPin:
+    """Pin handle whose on() and off() are the library call itself, bound to the pin
+
+    Every register write toggles DC, so the toggle path has no Python
+    layers of its own.
+    """
+    __slots__ = ('on', 'off', '_read', 'close')
+
+    def __init__(self, on, off, read, close):
+        self.on = on
+        self.off = off
+        self._read = read
+        self.close = close
+
+    @property
+    def value(self):
+        return int(self._read())
+
+class GpiozeroBackend(SpidevBackend):
+    """Real hardware: spidev for the bus, gpiozero for the pins"""
+
+    def __init__(self):
+        if DigitalOutputDevice is None:
+            raise RuntimeError('gpiozero is not installed, use LCD_BACKEND=sim to run without hardware')
+
+    def output(self, pin, initial=False):
+        return DigitalOutputDevice(pin,active_high = True,initial_value =initial)
+
+    def input(self, pin, pull_up=None, active_state=True):
+        return DigitalInputDevice(pin,pull_up=pull_up,active_state=active_state)
+
+    def pwm(self, pin, frequency):
+        return PWMOutputDevice(pin,frequency = frequency)
+
+class RPiGPIOBackend(SpidevBackend):
+    """Real hardware: spidev for the bus, RPi.GPIO for the pins (BCM numbering)"""
+
+    def __init__(self):
+        if GPIO is None:
+            raise RuntimeError('RPi.GPIO is not installed')
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+
+    def output(self, pin, initial=False):
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.HIGH if initial else GPIO.LOW)
+        return FastPin(functools.partial(GPIO.output, pin, GPIO.HIGH),
+                       functools.partial(GPIO.output, pin, GPIO.LOW),
+                       functools.partial(GPIO.input, pin),
+                       functools.partial(GPIO.cleanup, pin))
+
+    def input(self, pin, pull_up=None, active_state=True):
+        pull = {True: GPIO.PUD_UP, False: GPIO.PUD_DOWN, None: GPIO.PUD_OFF}[pull_up]
+        GPIO.setup(pin, GPIO.IN, pull_up_down=pull)
+        read = functools.partial(GPIO.input, pin)
+        # Like gpiozero, a pull-up makes the pin active low
+        if not (active_state if pull_up is None else not pull_up):
+            read = lambda: not GPIO.input(pin)
+        return FastPin(None, None, read, functools.partial(GPIO.cleanup, pin))
+
+    def pwm(self, pin, frequency):
+        return RPiGPIOPWM(pin, frequency)
+
+class RPiGPIOPWM:
+    """Software PWM of RPi.GPIO with the value/frequency interface of gpiozero"""
+
+    def __init__(self, pin, frequency):
+        GPIO.setup(pin, GPIO.OUT)
+        self.pin = pin
+        self._pwm = GPIO.PWM(pin, frequency)
+        self._pwm.start(0)
+        self._value = 0
+        self._frequency = frequency
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._pwm.ChangeDutyCycle(value * 100)
+        self._value = value
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, frequency):
+        self._pwm.ChangeFrequency(frequency)
+        self._frequency = frequency
+
+    def close(self):
+        self._pwm.stop()
+        GPIO.cleanup(self.pin)
+
+class LgpioBackend(SpidevBackend):
+    """Real hardware: spidev for the bus, lgpio handles on a gpiochip for the pins (Pi 5 and newer kernels)"""
+
+    def __init__(self, chip=0):
+        if lgpio is None:
+            raise RuntimeError('lgpio is not installed')
+        self.handle = lgpio.gpiochip_open(chip)
+
+    def output(self, pin, initial=False):
+        lgpio.gpio_claim_output(self.handle, pin, int(initial))
+        return FastPin(functools.partial(lgpio.gpio_write, self.handle, pin, 1),
+                       functools.partial(lgpio.gpio_write, self.handle, pin, 0),
+                       functools.partial(lgpio.gpio_read, self.handle, pin),
+                       functools.partial(lgpio.gpio_free, self.handle, pin))
+
+    def input(self, pin, pull_up=None, active_state=True):
+        flags = {True: lgpio.SET_PULL_UP, False: lgpio.SET_PULL_DOWN, None: lgpio.SET_PULL_NONE}[pull_up]
+        lgpio.gpio_claim_input(self.handle, pin, flags)
+        read = functools.partial(lgpio.gpio_read, self.handle, pin)
+        if not (active_state if pull_up is None else not pull_up):
+            read = lambda: not lgpio.gpio_read(self.handle, pin)
+        return FastPin(None, None, read, functools.partial(lgpio.gpio_free, self.handle, pin))
+
+    def pwm(self, pin, frequency):
+        return LgpioPWM(self.handle, pin, frequency)
+
+class LgpioPWM:
+    """lgpio software PWM with the value/frequency interface of gpiozero"""
+
+    def __init__(self, handle, pin, frequency):
+        self.handle = handle
+        self.pin = pin
+        self._value = 0
+        self._frequency = frequency
+        lgpio.gpio_claim_output(handle, pin, 0)
+
+    def _update(self):
+        lgpio.tx_pwm(self.handle, self.pin, self._frequency, self._value * 100)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._update()
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, frequency):
+        self._frequency = frequency
+        self._update()
+
+    def close(self):
+        lgpio.tx_pwm(self.handle, self.pin, 0, 0)
+        lgpio.gpio_free(self.handle, self.pin)
+
+# LCD_BACKEND names; 'mock' is the simulator
+BACKENDS = ['gpiozero', 'rpigpio', 'lgpio', 'sim', 'mock']
+
+def create_backend(name, dc=25, ram_size=(240, 320)):
+    """Backend by name, one of BACKENDS
+
+    dc and ram_size (frame memory columns, rows) set up the simulated controller.
+    """
+    if name in ('sim', 'mock'):
+        from .simulator import SimulatedBackend
+        return SimulatedBackend(dc, *ram_size)
+    if name == 'gpiozero':
+        return GpiozeroBackend()
+    if name == 'rpigpio':
+        return RPiGPIOBackend()
+    if name == 'lgpio':
+        return LgpioBackend()
+    raise ValueError('Unknown LCD_BACKEND {0!r}, expected one of {1}'.format(name, ', '.join(BACKENDS)))
+
+def default_backend(dc=25, ram_size=(240, 320)):
+    """Backend named by the LCD_BACKEND environment variable, gpiozero if it is not set"""
+    return create_backend(os.environ.get('LCD_BACKEND', 'gpiozero'), dc, ram_size)
 
 class RaspberryPi:
-    def __init__(self,spi=spidev.SpiDev(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000):
+    # Rows per band in spi_write_image; two band buffers are kept per display.
+    # Keep it even so 12-bit bands end on a whole pixel pair.
+    pipeline_rows = 32
+    _pipeline_queue = None
+    # Pixel format on the bus, 16 (RGB565) or 12 (RGB444, see frame.encode)
+    color_bits = 16
+
+    def __init__(self,spi=(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000,backend=None):
         self.np=np
+        # spi is a (bus, device) pair opened by the backend, an open SpiDev, or None
+        if backend is None:
+            # Panel descriptors give the controller's frame memory size
+            backend = default_backend(dc, (getattr(self, 'ram_width', 240), getattr(self, 'ram_height', 320)))
+        self.backend = backend
         self.INPUT = False
         self.OUTPUT = True
 
         self.SPEED  =spi_freq
         self.BL_freq=bl_freq
 
-        self.RST_PIN= self.gpio_mode(rst,self.OUTPUT)
+        # RST starts released, so creating a driver does not reset a running panel (see Panel.Resume)
+        self.RST_PIN= self.gpio_mode(rst,self.OUTPUT,initial = True)
         self.DC_PIN = self.gpio_mode(dc,self.OUTPUT)
         self.BL_PIN = self.gpio_pwm(bl)
         self.bl_DutyCycle(0)
         
         #Initialize SPI
+        if isinstance(spi, tuple):
+            spi = self.backend.open_spi(*spi)
         self.SPI = spi
         if self.SPI!=None :
             self.SPI.max_speed_hz = spi_freq
             self.SPI.mode = 0b00
 
-    def gpio_mode(self,Pin,Mode,pull_up = None,active_state = True):
+    def gpio_mode(self,Pin,Mode,pull_up = None,active_state = True,initial = False):
         if Mode:
-            return DigitalOutputDevice(Pin,active_high = True,initial_value =False)
+            return self.backend.output(Pin,initial)
         else:
-            return DigitalInputDevice(Pin,pull_up=pull_up,active_state=active_state)
+            return self.backend.input(Pin,pull_up=pull_up,active_state=active_state)
 
     def digital_write(self, Pin, value):
         if value:
@@ -74,12 +297,93 @@ class RaspberryPi:
         time.sleep(delaytime / 1000.0)
 
     def gpio_pwm(self,Pin):
-        return PWMOutputDevice(Pin,frequency = self.BL_freq)
+        return self.backend.pwm(Pin,self.BL_freq)
 
     def spi_writebyte(self, data):
         if self.SPI!=None :
             self.SPI.writebytes(data)
 
+    def spi_writebuffer(self, data):
+        # writebytes2 takes any buffer and splits it into transfers in C
+        if self.SPI!=None :
+            self.SPI.writebytes2(data)
+
+    def write_register(self, cmd, params=()):
+        """Send a command byte, then its whole parameter block in one transfer"""
+        # Straight to the pin handle, this runs for every register write
+        dc = self.DC_PIN
+        dc.off()
+        self.spi_writebyte([cmd])
+        if params:
+            dc.on()
+            self.spi_writebyte(params)
+
+    def write_registers(self, table):
+        """Program a register table of (cmd, params) or (cmd, params, delay_ms) entries"""
+        for entry in table:
+            self.write_register(entry[0], entry[1])
+            if len(entry) > 2:
+                self.delay_ms(entry[2])
+
+    def spi_write_image(self, Image, window):
+        """Encode an image and send it into one window (SetWindows arguments), band by band"""
+        img = frame.rgb_array(Image)
+        rows = self.pipeline_rows
+        self.spi_pipeline(((window if y == 0 else None), img[y:y + rows])
+                          for y in range(0, img.shape[0], rows))
+
+    def spi_pipeline(self, bands):
+        """Send (window, rgb) bands, encoding each band while the previous one is on the bus
+
+        window holds the SetWindows arguments to open before the band, or None
+        to continue writing the current window. Bands are encoded into two
+        reusable buffers that the writer thread hands back once sent. If
+        encoding fails, the buffer goes back and the queued bands are still
+        waited for, so the next call starts with both buffers free.
+        """
+        if self._pipeline_queue is None:
+            self._pipeline_start()
+        try:
+            for window, rgb in bands:
+                buf = self._pipeline_free.get()
+                try:
+                    size = frame.encoded_size(rgb.shape[0] * rgb.shape[1], self.color_bits)
+                    if buf.size < size:
+                        buf = np.empty(size, dtype=np.uint8)
+                    frame.encode(rgb, self.color_bits, out=buf[:size])
+                except BaseException:
+                    self._pipeline_free.put(buf)
+                    raise
+                self._pipeline_queue.put((window, buf, size))
+        finally:
+            self._pipeline_queue.join()
+            error, self._pipeline_error = self._pipeline_error, None
+        if error is not None:
+            raise error
+
+    def _pipeline_start(self):
+        self._pipeline_error = None
+        self._pipeline_free = queue.Queue()
+        self._pipeline_queue = queue.Queue()
+        for i in range(2):
+            self._pipeline_free.put(np.empty(0, dtype=np.uint8))
+        threading.Thread(target=self._pipeline_writer, name='spi-writer', daemon=True).start()
+
+    def _pipeline_writer(self):
+        while True:
+            window, buf, size = self._pipeline_queue.get()
+            try:
+                if self._pipeline_error is None:
+                    if window is not None:
+                        self.SetWindows(*window)
+                        self.digital_write(self.DC_PIN,True)
+                    self.spi_writebuffer(memoryview(buf)[:size])
+            except Exception as e:
+                self._pipeline_error = e
+            finally:
+                self._pipeline_free.put(buf)
+                self._pipeline_queue.task_done()
+
     def bl_DutyCycle(self, duty):
         self.BL_PIN.value = duty / 100
         
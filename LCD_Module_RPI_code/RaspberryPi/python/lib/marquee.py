@@ -0,0 +1,54 @@
+import numpy as np
+from . import frame
+
+class Marquee:
+    """Vertical ticker in a band of display rows, moved with the panel's scroll registers
+
+    The strip (an image or RGB565 frame as wide as the panel, taller than
+    the band) loops upwards through the band. Each step only writes the
+    strip rows that scroll into view, into the frame memory rows that just
+    scrolled out.
+    """
+
+    def __init__(self, disp, strip, top, rows):
+        self.disp = disp
+        self.pix = strip if frame.is_rgb565(strip) else frame.to_rgb565(strip)
+        if self.pix.shape[1] != disp.width:
+            raise ValueError('Strip must be as wide as the display ({0})'.format(disp.width))
+        if self.pix.shape[0] < rows:
+            raise ValueError('Strip must be at least {0} rows high'.format(rows))
+        self.top = top
+        self.rows = rows
+        self.offset = 0
+
+    def start(self):
+        """Draw the first band of the strip and enter scroll mode"""
+        self.offset = 0
+        self.disp.SetScrollArea(self.top, self.rows)
+        self.disp.SetScrollStart(self.top)
+        self._write_rows(0, self.rows)
+
+    def step(self, count=1):
+        """Scroll the strip up by count rows"""
+        count = min(count, self.rows)
+        self._write_rows(self.offset + self.rows, count)
+        self.offset += count
+        self.disp.SetScrollStart(self.top + self.offset % self.rows)
+
+    def stop(self):
+        """Leave scroll mode, the band has to be redrawn by the next frame"""
+        self.disp.ScrollOff()
+
+    def _write_rows(self, first, count):
+        # Strip row r (counted without wrapping) lives in frame memory row
+        # top + r % rows and shows strip row r % height, so a run of
+        # strip rows is at most two windows
+        height = self.pix.shape[0]
+        while count > 0:
+            line = first % self.rows
+            run = min(count, self.rows - line)
+            block = np.take(self.pix, np.arange(first, first + run) % height, axis=0)
+            self.disp.SetWindows(0, self.top + line, self.disp.width, self.top + line + run)
+            self.disp.WritePixels(block)
+            first += run
+            count -= run
@@ -0,0 +1,197 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from . import frame
+
+class FrameCache:
+    """Encoded RGB565 frames keyed by (source key, width, height), least recently used dropped first"""
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            pix = self._frames.pop(key, None)
+            if pix is not None:
+                self._frames[key] = pix
+            return pix
+
+    def put(self, key, pix):
+        with self._lock:
+            self._frames.pop(key, None)
+            if len(self._frames) >= self.capacity:
+                del self._frames[next(iter(self._frames))]
+            self._frames[key] = pix
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+class PanelOutput:
+    """Output thread of one panel: a one-slot mailbox of frames, superseded frames are dropped
+
+    bus_lock is held for each whole frame, so panels sharing an SPI bus (and
+    possibly the DC line) never interleave their transfers.
+    """
+
+    def __init__(self, name, disp, bus_lock):
+        self.name = name
+        self.disp = disp
+        self.bus_lock = bus_lock
+        self.shown = 0
+        self.dropped = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='panel-' + name, daemon=True)
+        self._thread.start()
+
+    def post(self, pix):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = pix
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                pix, self._pending = self._pending, None
+            try:
+                with self.bus_lock:
+                    self.disp.ShowFrame(pix)
+                self.shown += 1
+            except Exception as e:
+                logging.error("panel %s: %s", self.name, e)
+
+class PanelManager:
+    """Several panels driven from one process
+
+    Each panel gets its own output thread; decoding, resizing and RGB565
+    encoding run on one shared worker pool and land in one shared frame
+    cache, so a frame needed by two panels of the same size is converted
+    once, and one panel converting does not hold up the other's output.
+
+    show() and show_frame() never wait: they hand the frame (or its
+    conversion) over and return, so they can be called from an input or
+    render thread. The newest call per panel wins, a conversion that
+    finishes after a later show is not drawn.
+
+        manager = PanelManager()
+        manager.add('station', LCD_1inch28.LCD_1inch28())
+        manager.add('status', LCD_2inch.LCD_2inch(spi=(0, 1), rst=5, dc=6, bl=13), bus=0)
+        manager.show('station', 'logo/gta5/1', lambda: Image.open(path))
+    """
+
+    def __init__(self, workers=2, cache_size=32):
+        self.cache = FrameCache(cache_size)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='convert')
+        self.outputs = {}
+        self.sizes = {}
+        self._bus_locks = {}
+        self._inflight = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, disp, bus=0, size=None):
+        """Register an initialised panel; size is the (width, height) of its frames, portrait by default"""
+        if name in self.outputs:
+            raise ValueError('Panel {0!r} is already registered'.format(name))
+        lock = self._bus_locks.setdefault(bus, threading.Lock())
+        self.sizes[name] = size or (disp.width, disp.height)
+        self.outputs[name] = PanelOutput(name, disp, lock)
+        return self.outputs[name]
+
+    def convert(self, key, source, size):
+        """Future of the RGB565 frame of a source at a size, shared by every caller asking for it
+
+        source is a PIL image, an HxWx3 array or a callable returning one
+        (run on the pool, e.g. a file load). Requests for a frame that is
+        being converted join the running conversion.
+        """
+        cache_key = (key, size[0], size[1])
+        with self._lock:
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                return future
+            future = self.pool.submit(self._convert, cache_key, source, size)
+            self._inflight[cache_key] = future
+        # Outside the lock, the callback runs at once if the conversion already finished
+        future.add_done_callback(lambda f: self._done(cache_key))
+        return future
+
+    def frame(self, key, source, size):
+        """RGB565 frame of a source at a size, from the cache or converted on the pool"""
+        pix = self.cache.get((key, size[0], size[1]))
+        if pix is None:
+            pix = self.convert(key, source, size).result()
+        return pix
+
+    def show(self, name, key, source):
+        """Show a source on a panel without waiting, returns the conversion future (None on a cache hit)
+
+        A cached frame goes to the panel's output thread at once; otherwise
+        it is posted from the pool when the conversion finishes, unless a
+        later show or show_frame for the panel came first.
+        """
+        size = self.sizes[name]
+        pix = self.cache.get((key, size[0], size[1]))
+        if pix is not None:
+            self.show_frame(name, pix)
+            return None
+        token = object()
+        with self._lock:
+            self._latest[name] = token
+        future = self.convert(key, source, size)
+        future.add_done_callback(lambda f: self._converted(name, token, f))
+        return future
+
+    def show_frame(self, name, pix):
+        """Hand an already encoded RGB565 frame to a panel's output thread"""
+        with self._lock:
+            self._latest[name] = None
+            self.outputs[name].post(pix)
+
+    def close(self):
+        for output in self.outputs.values():
+            output.close()
+        self.pool.shutdown()
+
+    def _convert(self, cache_key, source, size):
+        pix = self.cache.get(cache_key)
+        if pix is not None:
+            return pix
+        image = source() if callable(source) else source
+        if isinstance(image, Image.Image) and image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        pix = frame.to_rgb565(image)
+        if pix.shape != (size[1], size[0]):
+            raise ValueError('Frame is {0}x{1}, expected {2}x{3}'.format(pix.shape[1], pix.shape[0], *size))
+        self.cache.put(cache_key, pix)
+        return pix
+
+    def _converted(self, name, token, future):
+        if future.exception() is not None:
+            logging.error("panel %s: %s", name, future.exception())
+            return
+        with self._lock:
+            if self._latest.get(name) is token:
+                self._latest[name] = None
+                self.outputs[name].post(future.result())
+
+    def _done(self, cache_key):
+        with self._lock:
+            self._inflight.pop(cache_key, None)
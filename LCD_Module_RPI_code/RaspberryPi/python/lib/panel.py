@@ -0,0 +1,467 @@
+import time
+import itertools
+import numpy as np
+from . import lcdconfig
+from . import frame
+
+# MADCTL bits: row address order, column address order, row/column exchange
+MADCTL_MY = 0x80
+MADCTL_MX = 0x40
+MADCTL_MV = 0x20
+
+class Panel(lcdconfig.RaspberryPi):
+    """Driver core shared by every LCD module
+
+    Each LCD_* class is a panel descriptor: it sets the attributes below and
+    only overrides methods for behaviour the core does not cover.
+    """
+    # Panel descriptor
+    width = 0
+    height = 0
+    x_offset = 0                # controller RAM offset of the visible area
+    y_offset = 0
+    landscape_x_offset = 0      # offsets used for landscape (height x width) frames
+    landscape_y_offset = 0
+    init_sequence = []          # register table, see lcdconfig.write_registers
+    madctl = None               # MADCTL for portrait frames, None to leave the register alone
+    madctl_landscape = None     # MADCTL for landscape frames, None if the panel has no landscape mode
+    scroll_lines = 0            # frame memory lines for vertical scrolling, 0 if not supported
+    colmod_16bit = 0x05         # COLMOD parameters for RGB565 and RGB444 pixels,
+    colmod_12bit = None         # None if the controller has no 12-bit mode
+    ram_width = 240             # controller frame memory columns and rows
+    ram_height = 320
+
+    # Orientation of frames on the glass, see SetRotation
+    rotation = 0
+    mirror = False
+    _orientations = None
+
+    # Differential mode: only send the regions that changed since the last
+    # frame, falling back to a full frame when more than this share changed
+    partial_update = False
+    partial_max_ratio = 0.5
+    _last_frame = None
+    # Round panels: when set, full frames are sent as this many row bands
+    # clipped to the inscribed circle (height = one window per row)
+    circle_bands = 0
+    _circle_windows = None
+
+    # Solid fills: per color, an encoded run of fill_chunk_rows rows that is
+    # sent repeatedly (an even pixel count, so 12-bit runs join up)
+    fill_chunk_rows = 16
+    fill_cache_size = 8
+    _fill_chunks = None
+
+    _madctl_sent = None
+    _horizontal = 0
+    _scroll_top = None
+    asleep = False
+    _woke_at = 0
+
+    def command(self, cmd):
+        self.digital_write(self.DC_PIN, False)
+        self.spi_writebyte([cmd])
+
+    def data(self, val):
+        self.digital_write(self.DC_PIN, True)
+        self.spi_writebyte([val])
+
+    def reset(self):
+        """Reset the display"""
+        self.digital_write(self.RST_PIN,True)
+        time.sleep(0.01)
+        self.digital_write(self.RST_PIN,False)
+        time.sleep(0.01)
+        self.digital_write(self.RST_PIN,True)
+        time.sleep(0.01)
+
+    def Init(self):
+        """Initialize dispaly"""
+        self.module_init()
+        self.reset()
+        self._madctl_sent = None
+        self._horizontal = 0
+        self._scroll_top = None
+        self._last_frame = None
+
+        self.write_registers(self.init_sequence)
+        if self.color_bits != 16:
+            self.SetColorMode(self.color_bits)
+
+    def Resume(self):
+        """Take over a panel that an earlier process initialised, without reset or init tables
+
+        The picture and frame memory are kept. Only the state this driver
+        changes at runtime is put back: scrolling is switched off and the
+        pixel format is set; MADCTL is rewritten with the next frame.
+        """
+        self.module_init()
+        self._madctl_sent = None
+        self._horizontal = 0
+        self._scroll_top = None
+        self._last_frame = None
+        # The last process may have left it in sleep mode
+        self.Wake()
+        if type(self).scroll_lines:
+            self.write_register(0x13)
+        self.SetColorMode(self.color_bits)
+
+    def Sleep(self):
+        """Enter sleep mode (SLPIN): the panel stops scanning, registers and frame memory are kept"""
+        # Sleep-in must come at least 120 ms after a sleep-out
+        time.sleep(max(0, self._woke_at + 0.12 - time.monotonic()))
+        self.write_register(0x10)
+        time.sleep(0.005)
+        self.asleep = True
+
+    def Wake(self):
+        """Leave sleep mode (SLPOUT), a no-op for the controller when it is awake"""
+        self.write_register(0x11)
+        time.sleep(0.005)
+        self._woke_at = time.monotonic()
+        self.asleep = False
+
+    def SetWindows(self, Xstart, Ystart, Xend, Yend, horizontal = 0):
+        xo, yo = self._window_offsets(horizontal)
+        Xstart, Xend = Xstart + xo, Xend - 1 + xo
+        Ystart, Yend = Ystart + yo, Yend - 1 + yo
+        #set the X coordinates
+        self.write_register(0x2A, [Xstart >> 8 & 0xff, Xstart & 0xff, Xend >> 8 & 0xff, Xend & 0xff])
+
+        #set the Y coordinates
+        self.write_register(0x2B, [Ystart >> 8 & 0xff, Ystart & 0xff, Yend >> 8 & 0xff, Yend & 0xff])
+
+        self.write_register(0x2C)
+
+    def SetColorMode(self, bits):
+        """Switch the pixel format to 16-bit RGB565 or 12-bit RGB444
+
+        12-bit pixels take 1.5 bytes instead of 2, a quarter less SPI traffic
+        per frame for 4 instead of 5-6 bits per channel.
+        """
+        colmod = {16: self.colmod_16bit, 12: self.colmod_12bit}.get(bits)
+        if colmod is None:
+            raise ValueError('{0} has no {1}-bit color mode'.format(type(self).__name__, bits))
+        self.write_register(0x3A, [colmod])
+        self.color_bits = bits
+
+    def WritePixels(self, pix):
+        """Send an RGB565 array (big-endian) into the open window in the current color mode"""
+        self.digital_write(self.DC_PIN,True)
+        if self.color_bits == 12:
+            self.spi_writebuffer(frame.rgb565_to_rgb444(pix))
+        else:
+            self.spi_writebuffer(frame.as_buffer(pix))
+
+    def SetMADCTL(self, value):
+        """Write the memory access control register, skipped if it already holds value"""
+        if value != self._madctl_sent:
+            self.write_register(0x36, [value])
+            self._madctl_sent = value
+
+    def SetScrollArea(self, top, rows):
+        """Scroll the display rows top..top+rows-1 in hardware (portrait only)
+
+        The rows above and below stay fixed. Once set, SetScrollStart picks
+        the frame memory row shown at the top of the area.
+        """
+        if not self.scroll_lines:
+            raise ValueError('{0} has no hardware vertical scrolling'.format(type(self).__name__))
+        fixed_top = top + self.y_offset
+        fixed_bottom = self.scroll_lines - fixed_top - rows
+        if rows <= 0 or fixed_bottom < 0:
+            raise ValueError('Scroll area rows {0}..{1} outside the panel'.format(top, top + rows - 1))
+        self.write_register(0x33, [fixed_top >> 8, fixed_top & 0xff, rows >> 8, rows & 0xff,
+                                   fixed_bottom >> 8, fixed_bottom & 0xff])
+        self._scroll_top = top
+        # The frame memory no longer matches what a partial update diffs against
+        self._last_frame = None
+
+    def SetScrollStart(self, row):
+        """Show frame memory row `row` (display coordinates) at the top of the scroll area"""
+        line = row + self.y_offset
+        self.write_register(0x37, [line >> 8, line & 0xff])
+
+    def ScrollOff(self):
+        """Leave vertical scroll mode, frame memory rows map to display rows again"""
+        if self._scroll_top is not None:
+            self.SetScrollStart(self._scroll_top)
+            self.write_register(0x13)
+            self._scroll_top = None
+
+    def SetRotation(self, rotation, mirror=False):
+        """Turn frames clockwise by 0, 90, 180 or 270 degrees on the glass, mirrored left to right first
+
+        Applied through MADCTL (and the matching RAM offsets) with the next
+        frame, so images are never rotated on the CPU. At 90 and 270 degrees
+        a panel that is not square takes frames of the other orientation.
+        """
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError('Rotation must be 0, 90, 180 or 270, got {0}'.format(rotation))
+        if self._base_madctl(self.madctl) is None:
+            raise ValueError('{0} has no known MADCTL setting to rotate'.format(type(self).__name__))
+        self.rotation = rotation
+        self.mirror = mirror
+        self._orientations = None
+        # Hardware scrolling runs along frame memory rows, which only match
+        # display rows in the panel's own orientation
+        self.scroll_lines = type(self).scroll_lines if not rotation and not mirror else 0
+
+    def _base_madctl(self, value):
+        # MADCTL of an orientation, falling back to what the init table writes
+        if value is None:
+            for entry in self.init_sequence:
+                if entry[0] == 0x36:
+                    value = entry[1][0]
+        return value
+
+    def Orientations(self):
+        """(frame width, frame height, MADCTL or None, x offset, y offset) per SetWindows flag"""
+        table = [(self.width, self.height, self.madctl, self.x_offset, self.y_offset)]
+        if self.madctl_landscape is not None:
+            table.append((self.height, self.width, self.madctl_landscape,
+                          self.landscape_x_offset, self.landscape_y_offset))
+        if not self.rotation and not self.mirror:
+            return table
+        if self._orientations is None:
+            self._orientations = [self._rotate_orientation(*entry) for entry in table]
+        return self._orientations
+
+    def _rotate_orientation(self, width, height, madctl, xo, yo):
+        # The visible area is fixed in frame memory: find the window that
+        # covers it under the rotated MADCTL
+        base = self._base_madctl(madctl)
+        value = rotate_madctl(base, self.rotation, self.mirror)
+        corners = [self._to_memory(base, x, y) for x, y in ((xo, yo), (xo + width - 1, yo + height - 1))]
+        (x0, y0), (x1, y1) = [self._from_memory(value, c, r) for c, r in corners]
+        if self.rotation in (90, 270):
+            width, height = height, width
+        return width, height, value, min(x0, x1), min(y0, y1)
+
+    def _to_memory(self, madctl, x, y):
+        c, r = (y, x) if madctl & MADCTL_MV else (x, y)
+        if madctl & MADCTL_MX:
+            c = self.ram_width - 1 - c
+        if madctl & MADCTL_MY:
+            r = self.ram_height - 1 - r
+        return c, r
+
+    def _from_memory(self, madctl, c, r):
+        if madctl & MADCTL_MX:
+            c = self.ram_width - 1 - c
+        if madctl & MADCTL_MY:
+            r = self.ram_height - 1 - r
+        return (r, c) if madctl & MADCTL_MV else (c, r)
+
+    def _window_offsets(self, horizontal):
+        if self._orientations is not None:
+            return self._orientations[horizontal][3:5]
+        if horizontal:
+            return self.landscape_x_offset, self.landscape_y_offset
+        return self.x_offset, self.y_offset
+
+    def FrameSize(self):
+        """(width, height) of frames in the orientation of the last full frame"""
+        return self.Orientations()[self._horizontal][:2]
+
+    def _orient(self, imwidth, imheight):
+        """Select portrait or landscape for a frame size, returns the SetWindows flag"""
+        if self.rotation or self.mirror:
+            for horizontal, (width, height, madctl, xo, yo) in enumerate(self.Orientations()):
+                if (imwidth, imheight) == (width, height):
+                    self.SetMADCTL(madctl)
+                    self._horizontal = horizontal
+                    return horizontal
+            raise ValueError('Image must be same dimensions as display \
+                ({0}x{1}).' .format(*self.Orientations()[0][:2]))
+        if imwidth == self.width and imheight == self.height:
+            horizontal = 0
+            if self.madctl is not None:
+                self.SetMADCTL(self.madctl)
+        elif (self.madctl_landscape is not None
+              and imwidth == self.height and imheight == self.width):
+            horizontal = 1
+            self.SetMADCTL(self.madctl_landscape)
+        else:
+            raise ValueError('Image must be same dimensions as display \
+                ({0}x{1}).' .format(self.width, self.height))
+        self._horizontal = horizontal
+        return horizontal
+
+    def ShowImage(self, Image):
+        """Set buffer to value of Python Imaging Library image."""
+        """Write display buffer to physical display
+
+        Also takes display-ready data without converting or copying it: an
+        HxWx3 uint8 array, or pre-encoded RGB565 as a 2-D '>u2' array or as
+        bytes, bytearray or memoryview (sized for the current orientation).
+        """
+        if frame.is_rgb565(Image):
+            if isinstance(Image, np.ndarray):
+                self.ShowFrame(frame.rgb565_frame(Image, Image.shape[1], Image.shape[0]))
+            else:
+                self.ShowFrame(frame.rgb565_frame(Image, *self.FrameSize()))
+            return
+        if self.partial_update:
+            # Diffing needs the whole encoded frame up front
+            self.ShowFrame(frame.to_rgb565(Image))
+            return
+        imwidth, imheight = frame.image_size(Image)
+        horizontal = self._orient(imwidth, imheight)
+        if self.circle_bands:
+            img = frame.rgb_array(Image)
+            self.spi_pipeline((window + (horizontal,), img[window[1]:window[3], window[0]:window[2]])
+                              for window in self.CircleWindows())
+        else:
+            self.spi_write_image(Image, (0, 0, imwidth, imheight, horizontal))
+
+    def ShowFrame(self, pix):
+        """Write an RGB565 frame (height x width, big-endian) to the display"""
+        if self.partial_update and self._last_frame is not None:
+            self.ShowChanges(pix, self._last_frame)
+            return
+        imheight, imwidth = pix.shape[:2]
+        horizontal = self._orient(imwidth, imheight)
+        self._write_frame(pix, horizontal)
+
+    def ShowChanges(self, pix, previous):
+        """Write only the regions of an RGB565 frame that differ from `previous`, the frame on the glass
+
+        Falls back to the whole frame when more than partial_max_ratio of it
+        changed, or when the two frames do not have the same shape.
+        """
+        imheight, imwidth = pix.shape[:2]
+        horizontal = self._orient(imwidth, imheight)
+        if previous.shape == pix.shape:
+            rects = frame.dirty_rects(previous, pix)
+            area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+            if area <= imwidth * imheight * self.partial_max_ratio:
+                for rect in rects:
+                    self._write_window(pix, *rect, horizontal)
+                if self.partial_update:
+                    self._last_frame = pix
+                return
+        self._write_frame(pix, horizontal)
+
+    def _write_frame(self, pix, horizontal):
+        imheight, imwidth = pix.shape[:2]
+        if self.circle_bands:
+            for rect in self.CircleWindows():
+                self._write_window(pix, *rect, horizontal)
+        else:
+            self._write_window(pix, 0, 0, imwidth, imheight, horizontal)
+        if self.partial_update:
+            self._last_frame = pix
+
+    def ShowRegion(self, Image, Xstart, Ystart):
+        """Write an image smaller than the screen with its top left corner at (Xstart, Ystart)
+
+        Coordinates follow the orientation of the last full frame. Takes a PIL
+        image, an HxWx3 uint8 array or a 2-D '>u2' RGB565 array.
+        """
+        imwidth, imheight = frame.image_size(Image)
+        width, height = self.FrameSize()
+        if Xstart < 0 or Ystart < 0 or Xstart + imwidth > width or Ystart + imheight > height:
+            raise ValueError('Region {0}x{1} at ({2},{3}) is outside the display ({4}x{5})'.format(
+                imwidth, imheight, Xstart, Ystart, width, height))
+        self._last_frame = None
+        if frame.is_rgb565(Image):
+            self.SetWindows(Xstart, Ystart, Xstart + imwidth, Ystart + imheight, self._horizontal)
+            self.WritePixels(frame.rgb565_frame(Image, imwidth, imheight))
+            return
+        self.spi_write_image(Image, (Xstart, Ystart, Xstart + imwidth, Ystart + imheight, self._horizontal))
+
+    def ShowRects(self, pix, rects):
+        """Write rectangles (x0, y0, x1, y1) of a full RGB565 frame
+
+        Coordinates follow the orientation of the last full frame.
+        """
+        self._last_frame = None
+        for rect in rects:
+            self._write_window(pix, *rect, self._horizontal)
+
+    def CircleWindows(self):
+        """Windows covering the visible circle, computed once per band count"""
+        if self._circle_windows is None or self._circle_windows[0] != self.circle_bands:
+            self._circle_windows = (self.circle_bands,
+                                    frame.circle_bands(self.width, self.height, self.circle_bands))
+        return self._circle_windows[1]
+
+    def _write_window(self, pix, Xstart, Ystart, Xend, Yend, horizontal = 0):
+        self.SetWindows ( Xstart, Ystart, Xend, Yend, horizontal)
+        self.WritePixels(pix[Ystart:Yend, Xstart:Xend])
+
+    def clear(self):
+        """Clear contents of image buffer"""
+        self.clear_color(0xFFFF)
+
+    def clear_color(self, color):
+        """Fill the screen with one RGB565 color"""
+        if self._horizontal or self.rotation in (90, 270):
+            self.fill_rect(0, 0, *self.FrameSize(), color)
+        elif self.circle_bands:
+            for x0, y0, x1, y1 in self.CircleWindows():
+                self.fill_rect(x0, y0, x1 - x0, y1 - y0, color)
+        else:
+            self.fill_rect(0, 0, self.width, self.height, color)
+
+    def fill_rect(self, x, y, w, h, color):
+        """Fill a rectangle with one RGB565 color (sent as RGB444 in 12-bit mode)
+
+        The pixels come from a cached run of encoded rows, so a fill only
+        costs the SPI time.
+        """
+        if w <= 0 or h <= 0:
+            return
+        chunk = self._fill_chunk(color)
+        self._last_frame = None
+        self.SetWindows(x, y, x + w, y + h, self._horizontal)
+        self.digital_write(self.DC_PIN,True)
+        remaining = frame.encoded_size(w * h, self.color_bits)
+        while remaining > 0:
+            size = min(remaining, len(chunk))
+            self.spi_writebuffer(chunk[:size])
+            remaining -= size
+
+    def _fill_chunk(self, color):
+        # fill_chunk_rows full rows of one color in the current color mode,
+        # the most recently used fill_cache_size colors are kept
+        if self._fill_chunks is None:
+            self._fill_chunks = {}
+        key = (color, self.color_bits)
+        chunk = self._fill_chunks.pop(key, None)
+        if chunk is None:
+            pixels = max(self.width, self.height) * self.fill_chunk_rows
+            if self.color_bits == 12:
+                data = frame.rgb565_to_rgb444(np.full(pixels, color, dtype=np.uint16))
+            else:
+                data = np.full(pixels, color, dtype='>u2')
+            chunk = memoryview(data.tobytes())
+            if len(self._fill_chunks) >= self.fill_cache_size:
+                del self._fill_chunks[next(iter(self._fill_chunks))]
+        self._fill_chunks[key] = chunk
+        return chunk
+
+def rotate_madctl(value, rotation, mirror=False):
+    """MADCTL that shows frames turned clockwise by `rotation` degrees (mirrored first) compared with `value`"""
+    def corners(madctl, transform=lambda x, y: (x, y)):
+        # Where the corners of a unit window land in frame memory
+        points = []
+        for x, y in ((0, 0), (1, 0), (0, 1)):
+            x, y = transform(x, y)
+            c, r = (y, x) if madctl & MADCTL_MV else (x, y)
+            points.append((1 - c if madctl & MADCTL_MX else c, 1 - r if madctl & MADCTL_MY else r))
+        return points
+
+    def turn(x, y):
+        if mirror:
+            x = 1 - x
+        for i in range(rotation // 90):
+            x, y = 1 - y, x
+        return x, y
+
+    wanted = corners(value, turn)
+    for bits in itertools.product((0, MADCTL_MY), (0, MADCTL_MX), (0, MADCTL_MV)):
+        candidate = (value & ~(MADCTL_MY | MADCTL_MX | MADCTL_MV)) | sum(bits)
+        if corners(candidate) == wanted:
+            return candidate
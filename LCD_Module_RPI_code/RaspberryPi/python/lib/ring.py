@@ -0,0 +1,73 @@
+import numpy as np
+
+class ProgressRing:
+    """Progress arc around the edge of a round frame, kept as a compositor layer and updated in place
+
+    Every ring pixel is listed once in a lookup table sorted by its angle
+    (clockwise from 12 o'clock), with its coverage of the ring's antialiased
+    edges. The table is cut into equal-angle segments with precomputed
+    bounding boxes. Setting the progress only fills or clears the table
+    entries between the old and the new angle and returns the boxes of the
+    segments they fall in, so a step of a few degrees touches a few dozen
+    pixels.
+
+        ring = ProgressRing(240, 240, color=0xFFFF)
+        compositor.place_pixels('progress', ring.pix, ring.alpha, 0, 0)
+        compositor.invalidate(ring.set(0.42))
+    """
+
+    def __init__(self, width, height, thickness=4, color=0xFFFF, track=None, margin=0, segments=120):
+        self.color = color
+        self.track = track
+        cx, cy = width / 2.0, height / 2.0
+        outer = min(width, height) / 2.0 - margin
+        inner = outer - thickness
+        dy, dx = np.mgrid[0:height, 0:width] + 0.5
+        dx -= cx
+        dy -= cy
+        dist = np.hypot(dx, dy)
+        coverage = np.clip(np.minimum(outer - dist, dist - inner) + 0.5, 0, 1)
+        ys, xs = np.nonzero(coverage > 0)
+        angles = np.degrees(np.arctan2(dx[ys, xs], -dy[ys, xs])) % 360
+        order = np.argsort(angles, kind='stable')
+        self.ys, self.xs, self.angles = ys[order], xs[order], angles[order]
+        self.coverage = (coverage[self.ys, self.xs] * 255).round().astype(np.uint8)
+
+        self.pix = np.full((height, width), color, dtype='>u2')
+        self.alpha = np.zeros((height, width), dtype=np.uint8)
+        if track is not None:
+            self.pix[self.ys, self.xs] = track
+            self.alpha[self.ys, self.xs] = self.coverage
+
+        # Segment k is table entries starts[k]:starts[k + 1]
+        self.starts = np.searchsorted(self.angles, np.linspace(0, 360, segments + 1))
+        self.starts[-1] = len(self.angles)
+        self.boxes = []
+        for s, e in zip(self.starts[:-1], self.starts[1:]):
+            if e > s:
+                sx, sy = self.xs[s:e], self.ys[s:e]
+                self.boxes.append((int(sx.min()), int(sy.min()), int(sx.max()) + 1, int(sy.max()) + 1))
+            else:
+                self.boxes.append(None)
+        self.filled = 0
+        self.progress = 0.0
+
+    def set(self, progress):
+        """Fill the arc up to progress (0 to 1), returns the boxes (x0, y0, x1, y1) of the segments that changed"""
+        self.progress = progress = min(max(progress, 0.0), 1.0)
+        count = int(np.searchsorted(self.angles, progress * 360, side='right'))
+        lo, hi = min(self.filled, count), max(self.filled, count)
+        if lo == hi:
+            return []
+        ys, xs = self.ys[lo:hi], self.xs[lo:hi]
+        if count > self.filled:
+            self.pix[ys, xs] = self.color
+            self.alpha[ys, xs] = self.coverage[lo:hi]
+        elif self.track is not None:
+            self.pix[ys, xs] = self.track
+        else:
+            self.alpha[ys, xs] = 0
+        self.filled = count
+        first = int(np.searchsorted(self.starts, lo, side='right')) - 1
+        last = int(np.searchsorted(self.starts, hi - 1, side='right')) - 1
+        return [box for box in self.boxes[first:last + 1] if box is not None]
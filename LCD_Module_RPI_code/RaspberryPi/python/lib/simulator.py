@@ -0,0 +1,282 @@
+"""Simulated SPI bus, GPIO pins and LCD controller for running without hardware
+
+Select it with LCD_BACKEND=sim, or pass backend=SimulatedBackend() to a
+driver. The controller interprets the command stream (CASET, RASET, RAMWR,
+MADCTL, COLMOD, sleep and the scrolling commands), keeps a virtual frame memory
+and counts the traffic:
+
+    disp = LCD_1inch28.LCD_1inch28(backend=SimulatedBackend())
+    disp.Init()
+    disp.ShowImage(image)
+    sim = disp.backend.panel
+    sim.bytes_written, sim.transactions
+    disp.backend.save_png(disp, 'frame.png')
+"""
+import numpy as np
+
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+RAMWRC = 0x3C
+MADCTL = 0x36
+COLMOD = 0x3A
+VSCRDEF = 0x33
+VSCSAD = 0x37
+NORON = 0x13
+SLPIN = 0x10
+SLPOUT = 0x11
+
+class SimulatedPin:
+    """Stand-in for a gpiozero output, input or PWM device"""
+
+    def __init__(self, pin, frequency=None):
+        self.pin = pin
+        self.value = 0
+        self.frequency = frequency
+        self.closed = False
+
+    def on(self):
+        self.value = 1
+
+    def off(self):
+        self.value = 0
+
+    def close(self):
+        self.closed = True
+
+class SimulatedSPI:
+    """Stand-in for spidev.SpiDev, every write goes to the simulated controller"""
+
+    def __init__(self, panel):
+        self.panel = panel
+        self.max_speed_hz = 0
+        self.mode = 0
+
+    def writebytes(self, data):
+        self.panel.write(data)
+
+    def writebytes2(self, data):
+        self.panel.write(data)
+
+    def close(self):
+        pass
+
+class SimulatedBackend:
+    """Backend for lcdconfig.RaspberryPi that drives a SimulatedPanel
+
+    dc is the data/command pin number the driver is created with. With
+    interpret=False the bus only counts traffic, for benchmarks.
+    """
+
+    def __init__(self, dc=25, ram_width=240, ram_height=320, interpret=True):
+        self.dc = dc
+        self.pins = {}
+        self.panel = SimulatedPanel(ram_width, ram_height, self._dc_level, interpret)
+
+    def _dc_level(self):
+        pin = self.pins.get(self.dc)
+        return bool(pin is not None and pin.value)
+
+    def open_spi(self, bus, device):
+        return SimulatedSPI(self.panel)
+
+    def output(self, pin, initial=False):
+        self.pins[pin] = SimulatedPin(pin)
+        self.pins[pin].value = int(initial)
+        return self.pins[pin]
+
+    def input(self, pin, pull_up=None, active_state=True):
+        self.pins[pin] = SimulatedPin(pin)
+        return self.pins[pin]
+
+    def pwm(self, pin, frequency):
+        self.pins[pin] = SimulatedPin(pin, frequency)
+        return self.pins[pin]
+
+    def frame(self, disp):
+        """RGB888 array of a driver's visible area, as the driver addresses it
+
+        Follows the orientation of the driver's last full frame, so it can be
+        compared with the image that was shown.
+        """
+        x, y = disp._window_offsets(disp._horizontal)
+        width, height = disp.FrameSize()
+        return self.panel.read_window(x, y, x + width, y + height)
+
+    def save_png(self, disp, path):
+        from PIL import Image
+        Image.fromarray(self.frame(disp)).save(path)
+
+    def save_npy(self, disp, path):
+        np.save(path, self.frame(disp))
+
+class SimulatedPanel:
+    """Command interpreter and frame memory of an MIPI-DCS style LCD controller
+
+    Frame memory is kept as RGB565 in the controller's native (portrait)
+    orientation. MADCTL row/column exchange and mirroring are applied to
+    writes; the BGR bit is ignored.
+    """
+
+    def __init__(self, ram_width=240, ram_height=320, dc_level=None, interpret=True):
+        self.interpret = interpret
+        self.ram_width = ram_width
+        self.ram_height = ram_height
+        self.dc_level = dc_level or (lambda: True)
+        self.memory = np.zeros((ram_height, ram_width), dtype=np.uint16)
+        self.registers = {}
+        self.log_windows = False
+        self.windows = []
+        self.madctl = 0
+        self.color_bits = 16
+        self.scroll = None          # (top fixed, scroll area, bottom fixed) while scrolling
+        self.scroll_start = 0
+        self.asleep = False
+        self.columns = (0, ram_width - 1)
+        self.rows = (0, ram_height - 1)
+        self.command = None
+        self._params = bytearray()
+        self._pending = b''
+        self._pointer = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.bytes_written = 0
+        self.transactions = 0
+        self.commands = 0
+        self.pixels_written = 0
+        self.command_counts = {}
+
+    def stats(self):
+        return {'bytes': self.bytes_written, 'transactions': self.transactions,
+                'commands': self.commands, 'pixels': self.pixels_written}
+
+    def write(self, data):
+        """One SPI transfer, interpreted by the level of the DC pin"""
+        if self.interpret:
+            data = bytes(data)
+        self.bytes_written += len(data)
+        self.transactions += 1
+        if not self.interpret:
+            return
+        if self.dc_level():
+            self._data(data)
+        else:
+            for cmd in data:
+                self._command(cmd)
+
+    def _command(self, cmd):
+        self._flush_pixel()
+        self.commands += 1
+        self.command_counts[cmd] = self.command_counts.get(cmd, 0) + 1
+        self.command = cmd
+        self._params = bytearray()
+        self._pending = b''
+        if cmd == RAMWR:
+            self._pointer = 0
+            if self.log_windows:
+                self.windows.append((self.columns, self.rows))
+        elif cmd == NORON:
+            self.scroll = None
+        elif cmd in (SLPIN, SLPOUT):
+            self.asleep = cmd == SLPIN
+
+    def _data(self, data):
+        if self.command in (RAMWR, RAMWRC):
+            self._pixels(data)
+            return
+        self._params.extend(data)
+        p = self._params
+        if self.command == CASET and len(p) >= 4:
+            self.columns = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif self.command == RASET and len(p) >= 4:
+            self.rows = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif self.command == MADCTL and len(p) >= 1:
+            self.madctl = p[0]
+        elif self.command == COLMOD and len(p) >= 1:
+            self.color_bits = {3: 12, 5: 16}.get(p[0] & 0x07, 16)
+        elif self.command == VSCRDEF and len(p) >= 6:
+            self.scroll = (p[0] << 8 | p[1], p[2] << 8 | p[3], p[4] << 8 | p[5])
+        elif self.command == VSCSAD and len(p) >= 2:
+            self.scroll_start = p[0] << 8 | p[1]
+        self.registers[self.command] = bytes(p)
+
+    def _pixels(self, data):
+        data = self._pending + data
+        if self.color_bits == 12:
+            whole = len(data) // 3 * 3
+            self._pending = data[whole:]
+            b = np.frombuffer(data, dtype=np.uint8, count=whole).reshape(-1, 3)
+            nibbles = np.empty((b.shape[0], 6), dtype=np.uint16)
+            nibbles[:, 0], nibbles[:, 1] = b[:, 0] >> 4, b[:, 0] & 0xF
+            nibbles[:, 2], nibbles[:, 3] = b[:, 1] >> 4, b[:, 1] & 0xF
+            nibbles[:, 4], nibbles[:, 5] = b[:, 2] >> 4, b[:, 2] & 0xF
+            self._store(_rgb444_to_rgb565(nibbles.reshape(-1, 3)))
+        else:
+            whole = len(data) // 2 * 2
+            self._pending = data[whole:]
+            self._store(np.frombuffer(data, dtype='>u2', count=whole // 2).astype(np.uint16))
+
+    def _flush_pixel(self):
+        # A 12-bit write with an odd pixel count ends on a half-used byte pair
+        if self.color_bits == 12 and len(self._pending) >= 2:
+            b = self._pending
+            self._store(_rgb444_to_rgb565(np.array([[b[0] >> 4, b[0] & 0xF, b[1] >> 4]], dtype=np.uint16)))
+        self._pending = b''
+
+    def _store(self, pix):
+        if pix.size == 0:
+            return
+        (x0, x1), (y0, y1) = self.columns, self.rows
+        width, height = x1 - x0 + 1, y1 - y0 + 1
+        if width <= 0 or height <= 0:
+            return
+        index = self._pointer + np.arange(pix.size)
+        self._pointer += pix.size
+        self.pixels_written += pix.size
+        row, col = self._address(x0 + index % width, y0 + (index // width) % height)
+        keep = (col >= 0) & (col < self.ram_width) & (row >= 0) & (row < self.ram_height)
+        self.memory[row[keep], col[keep]] = pix[keep]
+
+    def _address(self, x, y):
+        # Frame memory (row, col) of window coordinates under the current MADCTL
+        col, row = x, y
+        if self.madctl & 0x20:      # MV: the column counter drives frame memory rows
+            col, row = row, col
+        if self.madctl & 0x40:      # MX
+            col = self.ram_width - 1 - col
+        if self.madctl & 0x80:      # MY
+            row = self.ram_height - 1 - row
+        return row, col
+
+    def screen(self, x=0, y=0, width=None, height=None):
+        """RGB888 array of what the glass shows in frame memory layout, with scrolling applied"""
+        rows = np.arange(self.ram_height)
+        if self.scroll is not None:
+            top, area = self.scroll[0], self.scroll[1]
+            band = (rows >= top) & (rows < top + area)
+            rows[band] = top + (self.scroll_start - top + rows[band] - top) % max(area, 1)
+        shown = self.memory[rows]
+        width = self.ram_width - x if width is None else width
+        height = self.ram_height - y if height is None else height
+        return rgb565_to_rgb888(shown[y:y + height, x:x + width])
+
+    def read_window(self, Xstart, Ystart, Xend, Yend):
+        """RGB888 array of what the glass shows in a window, addressed like SetWindows"""
+        y, x = np.mgrid[Ystart:Yend, Xstart:Xend]
+        row, col = self._address(x, y)
+        return self.screen()[np.clip(row, 0, self.ram_height - 1), np.clip(col, 0, self.ram_width - 1)]
+
+def _rgb444_to_rgb565(rgb):
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    return ((r << 12) | ((r >> 3) << 11) | (g << 7) | ((g >> 2) << 5) | (b << 1) | (b >> 3)).astype(np.uint16)
+
+def rgb565_to_rgb888(pix):
+    """Expand an RGB565 array to HxWx3 uint8"""
+    pix = pix.astype(np.uint16)
+    out = np.empty(pix.shape + (3,), dtype=np.uint8)
+    r, g, b = pix >> 11, (pix >> 5) & 0x3F, pix & 0x1F
+    out[..., 0] = (r << 3) | (r >> 2)
+    out[..., 1] = (g << 2) | (g >> 4)
+    out[..., 2] = (b << 3) | (b >> 2)
+    return out
@@ -0,0 +1,140 @@
+import threading
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from . import frame
+
+DEFAULT_FONT = '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'
+# Rasterised up front, anything else when first used
+ATLAS_CHARS = ''.join(chr(c) for c in range(0x20, 0x7F)) + ''.join(chr(c) for c in range(0xA0, 0x100))
+
+class GlyphAtlas:
+    """Coverage masks of one font at one size, rasterised once, composed into RGB565 frames
+
+    All glyphs sit side by side in one uint8 atlas (line_height rows, the
+    ascender on row 0), so a line of text is built by copying atlas columns.
+    Built lines are kept, the next draw of the same text is a single blend.
+
+        font = atlas(size=24)
+        box = font.draw(pix, 'RADIO', 120, 130, frame.rgb565(255, 255, 0), anchor='mm')
+    """
+
+    def __init__(self, font, chars=ATLAS_CHARS, cache_size=128):
+        self.font = font
+        if hasattr(font, 'getmetrics'):
+            self.ascent, self.descent = font.getmetrics()
+        else:
+            # Bitmap fallback font: no metrics, the box of all glyphs
+            top, bottom = font.getbbox(chars)[1::2]
+            self.ascent, self.descent = bottom - top, 0
+        self.line_height = self.ascent + self.descent
+        self.cache_size = cache_size
+        self.atlas = np.zeros((self.line_height, 0), dtype=np.uint8)
+        self._glyphs = {}
+        self._lines = {}
+        self._lock = threading.Lock()
+        self._add(chars)
+
+    def _add(self, chars):
+        """Rasterise glyphs into the atlas: char -> (atlas column, width, left bearing, advance)"""
+        masks = []
+        glyphs = {}
+        column = self.atlas.shape[1]
+        for ch in chars:
+            if ch in self._glyphs or ch in glyphs:
+                continue
+            left, top, right, bottom = self.font.getbbox(ch)
+            width = max(0, right - left)
+            mask = Image.new('L', (width, self.line_height))
+            if width:
+                ImageDraw.Draw(mask).text((-left, 0), ch, fill=255, font=self.font)
+            masks.append(np.asarray(mask))
+            glyphs[ch] = (column, width, left, self.font.getlength(ch))
+            column += width
+        if masks:
+            self.atlas = np.hstack([self.atlas] + masks)
+        # Published after the atlas, a reader never sees a glyph beyond its end
+        self._glyphs.update(glyphs)
+
+    def measure(self, text):
+        """Advance width of a line of text in pixels"""
+        return int(round(sum(self._glyph(ch)[3] for ch in text)))
+
+    def _glyph(self, ch):
+        glyph = self._glyphs.get(ch)
+        if glyph is None:
+            with self._lock:
+                self._add(ch)
+            glyph = self._glyphs[ch]
+        return glyph
+
+    def line(self, text):
+        """(coverage mask, x of the pen origin in it, advance width) of a line of text, built once per text"""
+        with self._lock:
+            cached = self._lines.pop(text, None)
+            if cached is not None:
+                self._lines[text] = cached
+                return cached
+        glyphs = [self._glyph(ch) for ch in text]
+        pen = 0.0
+        placed = []
+        for column, width, left, advance in glyphs:
+            placed.append((int(round(pen)) + left, column, width))
+            pen += advance
+        lead = -min([x for x, column, width in placed] + [0])
+        right = max([x + width for x, column, width in placed] + [int(round(pen))])
+        mask = np.zeros((self.line_height, lead + right), dtype=np.uint8)
+        for x, column, width in placed:
+            # Overlapping glyphs keep the higher coverage
+            np.maximum(mask[:, lead + x:lead + x + width], self.atlas[:, column:column + width],
+                       out=mask[:, lead + x:lead + x + width])
+        line = (mask, lead, int(round(pen)))
+        with self._lock:
+            if len(self._lines) >= self.cache_size:
+                del self._lines[next(iter(self._lines))]
+            self._lines[text] = line
+        return line
+
+    def draw(self, pix, text, x, y, color, anchor='la'):
+        """Blend a line of text in an RGB565 color into a frame, returns the changed (x0, y0, x1, y1) or None
+
+        anchor follows PIL: horizontal l(eft), m(iddle), r(ight) of the
+        advance width; vertical a(scender), m(iddle), s (baseline), d(escender).
+        """
+        mask, lead, advance = self.line(text)
+        x -= {'l': 0, 'm': (advance + 1) // 2, 'r': advance}[anchor[0]] + lead
+        y -= {'a': 0, 'm': self.line_height // 2, 's': self.ascent, 'd': self.line_height}[anchor[1]]
+        height, width = pix.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + mask.shape[1], width), min(y + mask.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        region = pix[y0:y1, x0:x1]
+        region[...] = frame.blend_rgb565(region, np.uint16(color), mask[y0 - y:y1 - y, x0 - x:x1 - x])
+        return x0, y0, x1, y1
+
+_atlases = {}
+_atlases_lock = threading.Lock()
+
+def atlas(path=DEFAULT_FONT, size=20):
+    """Shared GlyphAtlas of a TrueType font at a size, PIL's default font if it cannot be loaded"""
+    key = (path, size)
+    with _atlases_lock:
+        if key not in _atlases:
+            try:
+                font = ImageFont.truetype(path, size)
+            except OSError:
+                font = ImageFont.load_default()
+            _atlases[key] = GlyphAtlas(font)
+        return _atlases[key]
+
+def text_frame(width, height, background):
+    """A width x height RGB565 frame filled with an RGB565 color, to draw text on"""
+    return np.full((height, width), background, dtype='>u2')
+
+def union(boxes):
+    """Bounding box of (x0, y0, x1, y1) boxes, None entries skipped; None if there are none"""
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
@@ -0,0 +1,139 @@
+import time
+import numpy as np
+
+class Slide:
+    """The incoming frame pushes the outgoing one out, towards `direction`"""
+
+    def __init__(self, old, new, direction='left'):
+        if direction not in ('left', 'right', 'up', 'down'):
+            raise ValueError('Unknown slide direction {0!r}'.format(direction))
+        self.old = old
+        self.new = new
+        self.direction = direction
+
+    def __call__(self, t):
+        axis = 1 if self.direction in ('left', 'right') else 0
+        size = self.old.shape[axis]
+        shift = int(round(t * size))
+        def span(start, stop):
+            return (slice(None), slice(start, stop)) if axis else (slice(start, stop),)
+        # Slices are copied into a '>u2' frame, concatenate would switch to native byte order
+        out = np.empty_like(self.old)
+        if self.direction in ('left', 'up'):
+            out[span(0, size - shift)] = self.old[span(shift, size)]
+            out[span(size - shift, size)] = self.new[span(0, shift)]
+        else:
+            out[span(0, shift)] = self.new[span(size - shift, size)]
+            out[span(shift, size)] = self.old[span(0, size - shift)]
+        return out
+
+class Crossfade:
+    """Per-channel linear blend, in 8-bit fixed point on the RGB565 channels"""
+
+    def __init__(self, old, new):
+        self.old = _channels(old)
+        self.delta = [b - a for a, b in zip(self.old, _channels(new))]
+
+    def __call__(self, t):
+        alpha = int(round(t * 256))
+        r, g, b = (a + ((d * alpha) >> 8) for a, d in zip(self.old, self.delta))
+        return ((r << 11) | (g << 5) | b).astype('>u2')
+
+class Wheel:
+    """A sweeping radius (clockwise from 12 o'clock) uncovers the incoming frame
+
+    Both frames turn with the sweep like logos on a dial: the outgoing one
+    rotates away by up to `angle` degrees while the incoming one rotates
+    into place. Pixels are resampled with nearest-neighbour index maps.
+    """
+
+    def __init__(self, old, new, angle=90):
+        self.old = old.reshape(-1)
+        self.new = new.reshape(-1)
+        self.shape = old.shape
+        self.angle = np.radians(angle)
+        height, width = old.shape
+        y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+        self.dx = x - (width - 1) / 2
+        self.dy = y - (height - 1) / 2
+        # Clockwise angle of every pixel from 12 o'clock, 0..1 of a turn
+        self.sweep = ((np.arctan2(self.dx, -self.dy) / (2 * np.pi)) % 1).reshape(-1)
+        self.dx, self.dy = self.dx.reshape(-1), self.dy.reshape(-1)
+
+    def _rotated(self, pix, angle):
+        height, width = self.shape
+        c, s = np.cos(angle), np.sin(angle)
+        sx = np.rint(self.dx * c + self.dy * s + (width - 1) / 2).astype(np.intp)
+        sy = np.rint(self.dy * c - self.dx * s + (height - 1) / 2).astype(np.intp)
+        np.clip(sx, 0, width - 1, out=sx)
+        np.clip(sy, 0, height - 1, out=sy)
+        return pix[sy * width + sx]
+
+    def __call__(self, t):
+        out = self._rotated(self.old, t * self.angle)
+        swept = self.sweep < t
+        out[swept] = self._rotated(self.new, (t - 1) * self.angle)[swept]
+        return out.reshape(self.shape)
+
+EFFECTS = {'slide': Slide, 'crossfade': Crossfade, 'wheel': Wheel}
+
+class Transition:
+    """Frame-paced animation from one RGB565 frame to another
+
+    Frames are rendered on demand for their time slot, so when rendering or
+    the bus falls behind, the late frames are skipped rather than queued and
+    the transition still ends on time. The last frame is always shown.
+    """
+
+    def __init__(self, old, new, effect='slide', duration=0.3, fps=30, **options):
+        if old.shape != new.shape:
+            raise ValueError('Frames differ in size: {0} and {1}'.format(old.shape, new.shape))
+        if effect not in EFFECTS:
+            raise ValueError('Unknown transition {0!r}, expected one of {1}'.format(effect, ', '.join(EFFECTS)))
+        self.old = old
+        self.new = new
+        self.effect = EFFECTS[effect](old, new, **options)
+        self.fps = fps
+        self.steps = max(1, int(round(duration * fps)))
+        self.shown = 0
+        self.dropped = 0
+        self.last = old
+
+    def frame(self, step):
+        """Frame for a step of 1..steps, the last step is the incoming frame itself"""
+        if step >= self.steps:
+            return self.new
+        return self.effect(step / self.steps)
+
+    def play(self, disp, wait=None):
+        """Show the transition on a display, returns False if wait() asked to stop early
+
+        wait(seconds) sleeps until the next frame is due and returns True to
+        abandon the transition (the display is left on self.last). Only the
+        regions that changed since the previous frame are sent.
+        """
+        start = time.perf_counter()
+        step = 0
+        self.shown = self.dropped = 0
+        while step < self.steps:
+            # Frame n is due n/fps after the start, skip slots already missed
+            late = int((time.perf_counter() - start) * self.fps)
+            following = min(self.steps, max(step + 1, late))
+            self.dropped += following - step - 1
+            step = following
+            pix = self.frame(step)
+            delay = start + step / self.fps - time.perf_counter()
+            if delay > 0:
+                if wait is not None:
+                    if wait(delay):
+                        return False
+                else:
+                    time.sleep(delay)
+            disp.ShowChanges(pix, self.last)
+            self.last = pix
+            self.shown += 1
+        return True
+
+def _channels(pix):
+    v = pix.astype(np.int32)
+    return [v >> 11, (v >> 5) & 0x3F, v & 0x1F]